@@ -0,0 +1,53 @@
+import argparse
+import asyncio
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+from pathlib import Path
+from models.player import SCHEMA_VERSION
+from services.cache import ROSTER, cache
+from services.player_service import backfill_derived_ratings as backfill
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+async def backfill_derived_ratings(batch_size: int, dry_run: bool):
+    """
+    Store derived ratings on players written before they existed, upgrading them to the
+    current schema. The server also runs this at startup; the script is for upgrading
+    a database without restarting, or checking what would change with --dry-run.
+    """
+    
+    # Connect to MongoDB
+    mongo_url = os.environ['MONGO_URL']
+    client = AsyncIOMotorClient(mongo_url)
+    db = client[os.environ['DB_NAME']]
+    
+    try:
+        total = await db.players.count_documents({"schemaVersion": {"$ne": SCHEMA_VERSION}})
+        print(f"Found {total} players to backfill")
+        
+        updated, errors = await backfill(db, batch_size, dry_run)
+        for error in errors:
+            print(f"Skipping {error}")
+        if updated and not dry_run:
+            await cache.invalidate(ROSTER)
+        
+        verb = "would be updated" if dry_run else "updated"
+        print(f"{updated} players {verb}, {len(errors)} skipped")
+        
+    except Exception as e:
+        print(f"Error backfilling derived ratings: {str(e)}")
+    
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute and store derived ratings for existing players")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(backfill_derived_ratings(args.batch_size, args.dry_run))
@@ -0,0 +1,71 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Only needed by the features that use them (similar players, spreadsheet imports,
+# thumbnails, the Redis cache, rating replay); none may load when the app starts
+DEFERRED_MODULES = ("numpy", "pandas", "openpyxl", "PIL", "redis")
+
+# Runs in a fresh interpreter, so every import is cold
+PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import server
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "ms": elapsed * 1000,
+    "modules": len(sys.modules),
+    "connected": sys.modules["database"]._client is not None,
+    "deferred": [m for m in {DEFERRED_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+def cold_import() -> dict:
+    env = dict(os.environ)
+    # Nothing connects at import, so any address will do
+    env.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    env.setdefault("DB_NAME", "startup_bench")
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure cold import of the app and fail past the budget")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=800.0, help="median import time of server.py")
+    parser.add_argument("--max-modules", type=int, default=600, help="modules loaded by importing server.py")
+    args = parser.parse_args()
+
+    runs = [cold_import() for _ in range(args.runs)]
+    import_ms = statistics.median(r["ms"] for r in runs)
+    process_ms = statistics.median(r["process_ms"] for r in runs)
+    modules = max(r["modules"] for r in runs)
+    print(f"cold import of server.py, median of {args.runs}")
+    print(f"  import:  {import_ms:8.1f} ms (budget {args.max_ms:.0f} ms)")
+    print(f"  process: {process_ms:8.1f} ms including interpreter startup")
+    print(f"  modules: {modules:8d}    (budget {args.max_modules})")
+
+    failures = []
+    if import_ms > args.max_ms:
+        failures.append(f"import took {import_ms:.0f} ms, budget {args.max_ms:.0f} ms")
+    if modules > args.max_modules:
+        failures.append(f"{modules} modules loaded, budget {args.max_modules}")
+    deferred = sorted({m for r in runs for m in r["deferred"]})
+    if deferred:
+        failures.append(f"modules meant to load on first use were imported at startup: {', '.join(deferred)}")
+    if any(r["connected"] for r in runs):
+        failures.append("a database client was created at import time")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,68 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from typing import List
+from pydantic import TypeAdapter
+from models.player import Player, player_from_db
+
+SKILLS = ("pace", "shooting", "passing", "defending", "dribbling", "physical")
+
+def synthetic_roster(count: int) -> List[dict]:
+    """Documents shaped like the players collection, with Mongo's _id"""
+    rng = random.Random(42)
+    docs = []
+    for i in range(count):
+        player = Player(
+            name=f"Player {i}",
+            position=rng.choice(["DEF", "MID", "ATT"]),
+            points=rng.randint(1, 99),
+            photo=f"https://example.com/{i}.jpg",
+            skills={skill: rng.randint(1, 99) for skill in SKILLS},
+            age=rng.randint(16, 50),
+            preferredFoot=rng.choice(["Left", "Right"]),
+            nationality="England",
+            availableDates=["2026-10-25"],
+        )
+        docs.append({"_id": i, **player.model_dump()})
+    return docs
+
+_player_list = TypeAdapter(List[Player])
+
+def validated_read(docs: List[dict]) -> bytes:
+    """The previous path: Player(**doc), then FastAPI's response_model validation and encoding"""
+    players = [Player(**doc) for doc in docs]
+    content = [p.model_dump() for p in players]
+    validated = _player_list.validate_python(content)
+    return json.dumps(_player_list.dump_python(validated, mode="json")).encode()
+
+def trusted_read(docs: List[dict]) -> bytes:
+    """player_from_db, serialized straight to JSON"""
+    return _player_list.dump_json([player_from_db(doc) for doc in docs])
+
+def best_of(fn, docs: List[dict], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(docs)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare validated and trusted roster reads")
+    parser.add_argument("--players", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    docs = synthetic_roster(args.players)
+    assert json.loads(validated_read(docs)) == json.loads(trusted_read(docs)), "responses differ"
+
+    validated_ms = best_of(validated_read, docs, args.repeat)
+    trusted_ms = best_of(trusted_read, docs, args.repeat)
+    print(f"{args.players} players, best of {args.repeat}")
+    print(f"  validated: {validated_ms:8.1f} ms")
+    print(f"  trusted:   {trusted_ms:8.1f} ms ({validated_ms / trusted_ms:.1f}x faster)")
@@ -0,0 +1,63 @@
+import os
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from models.player import DERIVED_FIELDS
+from services.job_service import JOB_TTL
+from services.sync_service import TOMBSTONE_TTL
+
+# One Motor client per process, created on first use rather than at import, so
+# importing the app (tests, tooling, worker boot) opens no connections or threads
+_client: Optional[AsyncIOMotorClient] = None
+_db: Optional[AsyncIOMotorDatabase] = None
+
+def get_db() -> AsyncIOMotorDatabase:
+    """The database handle for code outside a request, e.g. startup hooks"""
+    global _client, _db
+    if _db is None:
+        _client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+        _db = _client[os.environ['DB_NAME']]
+    return _db
+
+def set_db(db: AsyncIOMotorDatabase):
+    """Use another database handle, e.g. an in-memory mock in tests"""
+    global _db
+    _db = db
+
+async def get_database() -> AsyncIOMotorDatabase:
+    """FastAPI dependency for route handlers"""
+    return get_db()
+
+def close():
+    global _client, _db
+    if _client is not None:
+        _client.close()
+    _client, _db = None, None
+
+async def create_indexes(db: AsyncIOMotorDatabase):
+    """Every index the app relies on; safe to run repeatedly (server startup, restores)"""
+    # Shuffle pool selection: subscribed players available on a given date
+    await db.players.create_index([("isSubscribed", 1), ("availableDates", 1)])
+    # Delta sync: changed players and deletion tombstones, which expire with the sync window
+    await db.players.create_index([("updated_at", 1)])
+    # Name uniqueness checks on create, update and imports
+    await db.players.create_index([("name", 1)])
+    # Sorting and filtering by the stored derived ratings
+    for field in DERIVED_FIELDS:
+        await db.players.create_index([(field, -1), ("id", 1)])
+        await db.players.create_index([("position", 1), (field, -1), ("id", 1)])
+    await db.player_tombstones.create_index([("id", 1)], unique=True)
+    await db.player_tombstones.create_index(
+        [("deleted_at", 1)], expireAfterSeconds=int(TOMBSTONE_TTL.total_seconds())
+    )
+    # Shuffle history pages and teammate matrix rows
+    await db.shuffles.create_index([("created_at", -1), ("id", -1)])
+    await db.teammates.create_index([("players", 1), ("count", -1)])
+    # Short share links
+    await db.shares.create_index([("code", 1)], unique=True)
+    # Job lookups and listing; finished jobs expire
+    await db.jobs.create_index([("id", 1)], unique=True)
+    await db.jobs.create_index([("created_at", -1)])
+    await db.jobs.create_index([("finished_at", 1)], expireAfterSeconds=int(JOB_TTL.total_seconds()))
+    # Match listing, and rating replay in recording order
+    await db.matches.create_index([("playedAt", -1)])
+    await db.matches.create_index([("created_at", 1), ("id", 1)])
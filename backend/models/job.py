@@ -0,0 +1,30 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+import uuid
+from models.player import PlayerUpdate
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "interrupted")
+
+class Job(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    type: str  # import, bulk_update or batch_shuffle
+    status: str = "queued"  # one of JOB_STATUSES
+    total: int = 0  # items submitted
+    processed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    errors: List[str] = Field(default_factory=list)  # first MAX_JOB_ERRORS item errors
+    result: Optional[Dict[str, Any]] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None  # refreshed by the process running the job
+
+class BulkPlayerUpdate(BaseModel):
+    id: str
+    update: PlayerUpdate
+
+class BatchShuffleItem(BaseModel):
+    playerIds: List[str] = Field(..., min_length=16, max_length=16)
+    seed: Optional[int] = None
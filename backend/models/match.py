@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from datetime import datetime
+import uuid
+
+class MatchCreate(BaseModel):
+    team1: List[str] = Field(..., min_length=1, max_length=15)
+    team2: List[str] = Field(..., min_length=1, max_length=15)
+    team1Score: int = Field(..., ge=0, le=99)
+    team2Score: int = Field(..., ge=0, le=99)
+    shuffleId: Optional[str] = None  # confirmed shuffle this match was played from
+    playedAt: datetime = Field(default_factory=datetime.utcnow)
+
+class Match(MatchCreate):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    ratingChanges: Dict[str, float] = Field(default_factory=dict)  # player id -> rating delta
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,8 +1,27 @@
-from pydantic import BaseModel, Field
-from typing import Optional
-from datetime import datetime
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Any, Dict, List, Mapping, Optional
+from datetime import datetime, date
 import uuid
 
+# Bump whenever Player gains, loses or changes a field: documents written under an
+# older version go back through full validation on read (see player_from_db).
+SCHEMA_VERSION = 2
+
+def _iso_dates(values):
+    """Normalize availability dates to YYYY-MM-DD strings, the format the shuffle pool queries"""
+    if values is None:
+        return values
+    normalized = []
+    for value in values:
+        if isinstance(value, date):
+            normalized.append(value.strftime("%Y-%m-%d"))
+            continue
+        try:
+            normalized.append(datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d"))
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid availability date {value!r}, expected YYYY-MM-DD")
+    return sorted(set(normalized))
+
 class PlayerSkills(BaseModel):
     pace: int = Field(..., ge=1, le=99)
     shooting: int = Field(..., ge=1, le=99)
@@ -11,6 +30,27 @@ class PlayerSkills(BaseModel):
     dribbling: int = Field(..., ge=1, le=99)
     physical: int = Field(..., ge=1, le=99)
 
+# Skill weights of the derived ratings (each set sums to 1)
+POSITION_WEIGHTS = {
+    "DEF": {"defending": 0.4, "physical": 0.25, "passing": 0.2, "pace": 0.15},
+    "MID": {"passing": 0.35, "dribbling": 0.25, "physical": 0.15, "defending": 0.15, "shooting": 0.1},
+    "ATT": {"shooting": 0.4, "dribbling": 0.25, "pace": 0.25, "passing": 0.1},
+}
+ATTACK_WEIGHTS = {"shooting": 0.35, "dribbling": 0.25, "pace": 0.25, "passing": 0.15}
+DEFENCE_WEIGHTS = {"defending": 0.5, "physical": 0.3, "pace": 0.2}
+DERIVED_FIELDS = ("overall", "positionRating", "attack", "defence")
+
+def derived_ratings(skills: Mapping[str, int], position: str) -> Dict[str, float]:
+    """Ratings stored alongside the skills they come from, so sorts and filters can use an index"""
+    def weighted(weights):
+        return round(sum(skills[skill] * weight for skill, weight in weights.items()), 1)
+    return {
+        "overall": round(sum(skills[skill] for skill in PlayerSkills.model_fields) / len(PlayerSkills.model_fields), 1),
+        "positionRating": weighted(POSITION_WEIGHTS[position]),
+        "attack": weighted(ATTACK_WEIGHTS),
+        "defence": weighted(DEFENCE_WEIGHTS),
+    }
+
 class Player(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str = Field(..., min_length=1, max_length=100)
@@ -22,8 +62,50 @@ class Player(BaseModel):
     preferredFoot: str = Field(..., pattern="^(Left|Right)$")
     nationality: str = Field(..., min_length=1, max_length=50)
     isSubscribed: bool = Field(default=False)  # New field for subscription status
+    availableDates: List[str] = Field(default_factory=list)  # ISO dates (YYYY-MM-DD) the player can play
+    gamesPlayed: int = Field(default=0, ge=0)
+    lastPlayedAt: Optional[datetime] = None
+    rating: Optional[float] = None  # match-driven rating on the points scale, set after the first recorded match
+    seedRating: Optional[float] = None  # rating before the first recorded match, used to replay history
+    # Derived from skills and position on every write (see derived_ratings)
+    overall: Optional[float] = None
+    positionRating: Optional[float] = None
+    attack: Optional[float] = None
+    defence: Optional[float] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    schemaVersion: int = SCHEMA_VERSION  # Player schema the document was written with
+
+    @model_validator(mode="after")
+    def _derive_ratings(self):
+        for field, value in derived_ratings(self.skills.model_dump(), self.position).items():
+            setattr(self, field, value)
+        return self
+
+_PLAYER_FIELDS = frozenset(Player.model_fields)
+
+def new_trusted_player(values: Dict[str, Any]) -> Player:
+    """
+    New Player from create fields that were already validated elsewhere (e.g. column-wise
+    by the spreadsheet import), filling in defaults without re-validating.
+    """
+    fields = {name: values[name] for name in Player.model_fields if name in values}
+    fields.update(derived_ratings(fields["skills"], fields["position"]))
+    fields["skills"] = PlayerSkills.model_construct(**dict(fields["skills"]))
+    return Player.model_construct(**fields)
+
+def player_from_db(doc: Dict[str, Any]) -> Player:
+    """
+    Player from a document in our own players collection. Documents written with the
+    current schema were validated on the way in, so they are wrapped without
+    re-validation; older, unversioned or incomplete documents are validated as usual.
+    """
+    if doc.get("schemaVersion") != SCHEMA_VERSION or doc.keys() - {"_id"} != _PLAYER_FIELDS:
+        return Player(**doc)
+    fields = dict(doc)
+    fields.pop("_id", None)
+    fields["skills"] = PlayerSkills.model_construct(**doc["skills"])
+    return Player.model_construct(**fields)
 
 class PlayerCreate(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
@@ -35,6 +117,9 @@ class PlayerCreate(BaseModel):
     preferredFoot: str = Field(..., pattern="^(Left|Right)$")
     nationality: str = Field(..., min_length=1, max_length=50)
     isSubscribed: bool = Field(default=False)
+    availableDates: List[str] = Field(default_factory=list)
+
+    _validate_available_dates = field_validator("availableDates", mode="before")(_iso_dates)
 
 class PlayerUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=100)
@@ -46,4 +131,7 @@ class PlayerUpdate(BaseModel):
     preferredFoot: Optional[str] = Field(None, pattern="^(Left|Right)$")
     nationality: Optional[str] = Field(None, min_length=1, max_length=50)
     isSubscribed: Optional[bool] = None
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    availableDates: Optional[List[str]] = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    _validate_available_dates = field_validator("availableDates", mode="before")(_iso_dates)
@@ -0,0 +1,45 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+import uuid
+
+class ShuffleConstraints(BaseModel):
+    playerIds: List[str] = Field(..., min_length=16, max_length=30)
+    mustLink: List[Tuple[str, str]] = Field(default_factory=list)  # pairs kept on the same team
+    cannotLink: List[Tuple[str, str]] = Field(default_factory=list)  # pairs kept on opposite teams
+    minPositions: Dict[str, int] = Field(default_factory=lambda: {"DEF": 2, "ATT": 2, "MID": 1})  # per team
+    exhaustive: bool = False  # keep searching for the best balance until the time limit
+    timeLimitMs: int = Field(default=2000, ge=50, le=10000)
+
+class TeamRecord(BaseModel):
+    playerIds: List[str]
+    totalPoints: int
+    formation: str
+
+class ShuffleRecord(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    team1: TeamRecord
+    team2: TeamRecord
+    date: Optional[str] = None  # game date (YYYY-MM-DD), if known
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class ShuffleConfirm(BaseModel):
+    team1: List[str] = Field(..., min_length=1, max_length=15)
+    team2: List[str] = Field(..., min_length=1, max_length=15)
+    date: Optional[str] = Field(None, pattern=r"^\d{4}-\d{2}-\d{2}$")
+
+class ShuffleHistoryPage(BaseModel):
+    items: List[ShuffleRecord]
+    nextCursor: Optional[str] = None  # pass back as `before` for the next page
+
+class GameDetails(BaseModel):
+    date: Optional[str] = Field(None, max_length=50)  # defaults to the upcoming Sunday
+    time: Optional[str] = Field(None, max_length=50)
+    venue: Optional[str] = Field(None, max_length=100)
+    price: Optional[str] = Field(None, max_length=50)
+
+class ShareCreate(BaseModel):
+    shuffleId: Optional[str] = None  # a confirmed shuffle from the history
+    playerIds: Optional[List[str]] = Field(None, min_length=16, max_length=16)  # or a seeded custom shuffle
+    seed: Optional[int] = None
+    details: GameDetails = Field(default_factory=GameDetails)
@@ -0,0 +1,85 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+from pathlib import Path
+from datetime import datetime
+from pymongo import UpdateOne
+from services.cache import MemoryCache, ROSTER, cache
+from services.rating_service import K_FACTOR, SCALE, match_lease, points_for_rating
+from services.rating_replay import replay_ratings
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+async def recompute_ratings(k_factor: float, scale: float, dry_run: bool):
+    """Replay all recorded matches, in the order they were recorded, from each player's seed rating"""
+    
+    # Connect to MongoDB
+    mongo_url = os.environ['MONGO_URL']
+    client = AsyncIOMotorClient(mongo_url)
+    db = client[os.environ['DB_NAME']]
+    
+    try:
+        # Matches recorded during the replay would be overwritten, so hold them off
+        async with match_lease(db):
+            players = await db.players.find(
+                {}, {"_id": 0, "id": 1, "points": 1, "seedRating": 1}
+            ).to_list(None)
+            matches = await db.matches.find(
+                {}, {"_id": 0, "team1": 1, "team2": 1, "team1Score": 1, "team2Score": 1}
+            ).sort([("created_at", 1), ("id", 1)]).to_list(None)
+            print(f"Replaying {len(matches)} matches for {len(players)} players")
+            
+            seeds = {
+                p["id"]: p["seedRating"] if p.get("seedRating") is not None else float(p["points"])
+                for p in players
+            }
+            started = time.perf_counter()
+            ratings = replay_ratings(seeds, matches, k_factor, scale)
+            print(f"Replay took {(time.perf_counter() - started) * 1000:.1f} ms")
+            
+            # Only players that took part in a match carry a rating
+            played = {player_id for m in matches for player_id in m["team1"] + m["team2"]}
+            now = datetime.utcnow()
+            updates = [
+                UpdateOne(
+                    {"id": player_id},
+                    {"$set": {
+                        "rating": rating,
+                        "points": points_for_rating(rating),
+                        "seedRating": seeds[player_id],
+                        "updated_at": now,
+                    }}
+                )
+                for player_id, rating in ratings.items() if player_id in played
+            ]
+            
+            if dry_run:
+                print(f"Dry run: {len(updates)} players would be updated")
+            elif updates:
+                result = await db.players.bulk_write(updates, ordered=False)
+                # Delta sync picks the players up through updated_at; cached rosters are dropped here
+                await cache.invalidate(ROSTER)
+                print(f"Successfully updated {result.modified_count} players")
+                if isinstance(cache, MemoryCache):
+                    print("CACHE_BACKEND is memory: restart the server so workers drop the old ratings")
+        
+    except Exception as e:
+        print(f"Error recomputing ratings: {str(e)}")
+    
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute player ratings from the full match history")
+    parser.add_argument("--k-factor", type=float, default=K_FACTOR)
+    parser.add_argument("--scale", type=float, default=SCALE)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(recompute_ratings(args.k_factor, args.scale, args.dry_run))
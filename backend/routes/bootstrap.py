@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import Response
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from database import get_database
+from services.bootstrap_service import bootstrap, etag_matches
+
+router = APIRouter(prefix="/api", tags=["bootstrap"])
+
+@router.get("/bootstrap")
+async def get_bootstrap(
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Roster, latest confirmed shuffle and roster stats in one response, for the app's first paint"""
+    body, etag = await bootstrap(db)
+    # Clients keep the response and revalidate it on every load
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "no-cache"}
+    if etag_matches(etag, if_none_match):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from database import get_database
+from models.shuffle import ShuffleConfirm, ShuffleRecord, ShuffleHistoryPage
+from services.history_service import record_shuffle, shuffle_history, teammate_count, frequent_teammates
+
+router = APIRouter(prefix="/api/shuffle", tags=["history"])
+
+@router.post("/history", response_model=ShuffleRecord)
+async def confirm_shuffle(shuffle: ShuffleConfirm, db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Store a confirmed shuffle"""
+    try:
+        return await record_shuffle(db, shuffle.team1, shuffle.team2, shuffle.date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/history", response_model=ShuffleHistoryPage)
+async def get_shuffle_history(
+    limit: int = Query(20, ge=1, le=100),
+    before: Optional[str] = None,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Get confirmed shuffles, newest first. Pass `nextCursor` as `before` for the next page"""
+    try:
+        return await shuffle_history(db, limit, before)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/teammates/{player_id}")
+async def get_frequent_teammates(
+    player_id: str,
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Get the players most often on the same team as a player"""
+    return await frequent_teammates(db, player_id, limit)
+
+@router.get("/teammates/{player_id}/{other_id}")
+async def get_teammate_count(player_id: str, other_id: str, db: AsyncIOMotorDatabase = Depends(get_database)):
+    """How many confirmed shuffles had two players on the same team"""
+    return {"count": await teammate_count(db, player_id, other_id)}
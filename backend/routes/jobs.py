@@ -0,0 +1,127 @@
+from fastapi import APIRouter, HTTPException, Depends, File, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from typing import List
+import asyncio
+import json
+import tempfile
+from motor.motor_asyncio import AsyncIOMotorDatabase
+import os
+
+from database import get_database
+from models.job import Job, BatchShuffleItem, BulkPlayerUpdate
+from models.player import PlayerCreate
+from services.batch_service import batch_shuffle_job, bulk_update_job, import_file_job, import_players_job
+from services.spreadsheet_service import UPLOAD_KINDS
+from services.job_service import job_runner, FINISHED
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(100 * 1024 * 1024)))
+
+@router.post("/import", response_model=Job, status_code=202)
+async def submit_import(players: List[PlayerCreate], db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Import players in the background; poll the job or follow its events for progress"""
+    return await job_runner.submit(db, "import", len(players), lambda ctx: import_players_job(db, players, ctx))
+
+@router.post("/import-file", response_model=Job, status_code=202)
+async def submit_import_file(file: UploadFile = File(...), db: AsyncIOMotorDatabase = Depends(get_database)):
+    """
+    Import players from a CSV or XLSX upload in the background. Columns: name, position,
+    points, age, preferredFoot, nationality, the six skills (optionally as skills.pace etc.),
+    and optionally photo, isSubscribed and availableDates (YYYY-MM-DD separated by ;).
+    """
+    suffix = os.path.splitext(file.filename or "")[1].lower()
+    if suffix not in UPLOAD_KINDS:
+        raise HTTPException(status_code=400, detail="Upload a .csv or .xlsx file")
+
+    # Spool to disk so the job can read it in chunks after this request returns
+    size = 0
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as spooled:
+        while block := await file.read(1024 * 1024):
+            size += len(block)
+            if size > MAX_UPLOAD_BYTES:
+                spooled.close()
+                os.remove(spooled.name)
+                raise HTTPException(status_code=413, detail="File too large")
+            spooled.write(block)
+
+    path, kind = spooled.name, UPLOAD_KINDS[suffix]
+    try:
+        # The job removes the file when it ends, even if it is cancelled while queued
+        return await job_runner.submit(
+            db, "import", 0, lambda ctx: import_file_job(db, path, kind, ctx), cleanup=lambda: os.remove(path)
+        )
+    except Exception:
+        os.remove(path)
+        raise
+
+@router.post("/bulk-update", response_model=Job, status_code=202)
+async def submit_bulk_update(updates: List[BulkPlayerUpdate], db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Apply many partial player updates in the background"""
+    return await job_runner.submit(db, "bulk_update", len(updates), lambda ctx: bulk_update_job(db, updates, ctx))
+
+@router.post("/batch-shuffle", response_model=Job, status_code=202)
+async def submit_batch_shuffle(items: List[BatchShuffleItem], db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Shuffle many squads of 16 in the background"""
+    return await job_runner.submit(db, "batch_shuffle", len(items), lambda ctx: batch_shuffle_job(db, items, ctx))
+
+@router.get("/", response_model=List[Job])
+async def get_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Most recent jobs, without their results"""
+    jobs = await db.jobs.find({}, {"_id": 0, "result": 0}).sort("created_at", -1).limit(limit).to_list(limit)
+    return [job_runner.get(job["id"]) or Job(**job) for job in jobs]
+
+async def _load_job(db: AsyncIOMotorDatabase, job_id: str) -> Job:
+    # Unfinished jobs of this process are fresher in memory than in Mongo;
+    # another process's job is interrupted once that process stops heartbeating it
+    job = job_runner.get(job_id)
+    if job is None:
+        doc = await db.jobs.find_one({"id": job_id}, {"_id": 0})
+        if not doc:
+            raise HTTPException(status_code=404, detail="Job not found")
+        job = Job(**doc)
+        if job_runner.is_orphaned(job):
+            job = await job_runner.mark_interrupted(db, job)
+    return job
+
+@router.get("/{job_id}", response_model=Job)
+async def get_job(job_id: str, db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Job status, progress counts, errors and, once finished, its result"""
+    return await _load_job(db, job_id)
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: str, request: Request, db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Server-sent events with the job's progress, ending once it finishes"""
+    queue = job_runner.subscribe(job_id)
+    job = await _load_job(db, job_id)
+
+    def frame(snapshot) -> str:
+        # Progress frames leave out the result; fetch the job for it
+        snapshot = {k: v for k, v in jsonable_encoder(snapshot).items() if k != "result"}
+        return f"event: progress\ndata: {json.dumps(snapshot)}\n\n"
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            yield frame(job)
+            status = job.status
+            while status not in FINISHED and not await request.is_disconnected():
+                try:
+                    snapshot = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                status = snapshot["status"]
+                yield frame(snapshot)
+        finally:
+            job_runner.unsubscribe(job_id, queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
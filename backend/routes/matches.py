@@ -0,0 +1,27 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import List
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from database import get_database
+from models.match import Match, MatchCreate
+from services.rating_service import record_match
+
+router = APIRouter(prefix="/api/matches", tags=["matches"])
+
+@router.post("/", response_model=Match)
+async def create_match(match_data: MatchCreate, db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Record a match result and update the players' ratings"""
+    try:
+        return await record_match(db, match_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/", response_model=List[Match])
+async def get_matches(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Get recorded matches, most recent first"""
+    matches = await db.matches.find({}, {"_id": 0}).sort("playedAt", -1).skip(skip).limit(limit).to_list(limit)
+    return [Match(**match) for match in matches]
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, HTTPException, Depends, Header, Response
+from typing import Optional
+
+from services.photo_service import PhotoService, THUMBNAIL_SIZES, get_photo_service
+
+router = APIRouter(prefix="/api/photos", tags=["photos"])
+
+# A URL carrying the current version never changes content; a bare URL is revalidated daily
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "public, max-age=86400"
+
+@router.get("/{player_id}/{size}")
+async def get_thumbnail(
+    player_id: str,
+    size: str,
+    v: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    photos: PhotoService = Depends(get_photo_service)
+):
+    """Get a resized player photo (`sm` or `md`). Append `?v=<ETag>` for a permanently cacheable URL"""
+    if size not in THUMBNAIL_SIZES:
+        raise HTTPException(status_code=404, detail=f"Unknown size. Available: {list(THUMBNAIL_SIZES)}")
+
+    etag = await photos.etag(player_id, size)
+    if etag is None:
+        raise HTTPException(status_code=404, detail="Photo not found")
+
+    headers = {"ETag": f'"{etag}"', "Cache-Control": IMMUTABLE if v == etag else REVALIDATE}
+    if if_none_match and etag in {tag.strip().strip('"').removeprefix('W/"') for tag in if_none_match.split(",")}:
+        return Response(status_code=304, headers=headers)
+
+    data = await photos.thumbnail(player_id, size, etag)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    return Response(content=data, media_type="image/jpeg", headers=headers)
+
+@router.get("/")
+async def photo_cache_stats(photos: PhotoService = Depends(get_photo_service)):
+    """Thumbnail cache usage"""
+    return photos.cache.stats()
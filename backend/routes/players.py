@@ -1,25 +1,102 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from typing import List, Optional
+import asyncio
 from motor.motor_asyncio import AsyncIOMotorDatabase
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from models.player import Player, PlayerCreate, PlayerUpdate
-import json
-from datetime import datetime
-
-def get_database():
-    from server import db
-    return db
+from database import get_database
+from models.player import Player, PlayerCreate, PlayerUpdate, DERIVED_FIELDS, player_from_db
+from services.singleflight import roster_flight
+from services.cache import cache, ROSTER
+from services.events import roster_events
+from services.sync_service import player_changes, record_tombstone
+from services.search_service import fresh_search_index, MAX_RESULTS
+from services.similarity_service import fresh_similarity_index, MAX_K
+from services.stats_service import roster_stats
+from services.player_service import update_player as apply_player_update, PlayerNotFound, ranked_players
+from pydantic import TypeAdapter
 
 router = APIRouter(prefix="/api/players", tags=["players"])
 
+_player_list = TypeAdapter(List[Player])
+
+def _json(body) -> Response:
+    # Models read with player_from_db are already valid, so skip FastAPI's
+    # response_model re-validation and serialize them directly
+    return Response(body, media_type="application/json")
+
 @router.get("/", response_model=List[Player])
 async def get_all_players(db: AsyncIOMotorDatabase = Depends(get_database)):
     """Get all players"""
+    generation = await cache.generation(ROSTER)
+    roster = await cache.get(ROSTER, "roster")
+    if roster is None:
+        # Concurrent roster requests share one query and one serialization
+        roster = await roster_flight.do(generation, lambda: _load_players(db, generation))
+    return _json(roster)
+
+async def _load_players(db: AsyncIOMotorDatabase, generation: int) -> str:
     players = await db.players.find().to_list(1000)
-    return [Player(**player) for player in players]
+    roster = _player_list.dump_json([player_from_db(player) for player in players]).decode()
+    await cache.set(ROSTER, "roster", roster, generation)
+    return roster
+
+@router.get("/events")
+async def player_events(request: Request, last_event_id: Optional[str] = Header(None)):
+    """Server-sent events stream of player creates, updates (changed fields only) and deletes"""
+    queue = roster_events.subscribe(last_event_id)
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle connection
+                    yield ": keepalive\n\n"
+        finally:
+            roster_events.unsubscribe(queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/changes")
+async def get_player_changes(since: Optional[str] = None, db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Players created or updated since a sync token, ids deleted since then, and the next token"""
+    try:
+        return await player_changes(db, since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/search")
+async def search_players(
+    q: str = "",
+    limit: int = Query(10, ge=1, le=MAX_RESULTS),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Typeahead over names and nationalities, served from the in-memory index"""
+    return (await fresh_search_index(db)).search(q, limit)
+
+@router.get("/stats")
+async def get_player_stats(db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Position counts, points by position, subscription ratio and skill distributions"""
+    return await roster_stats(db)
+
+@router.get("/ranked", response_model=List[Player])
+async def get_ranked_players(
+    by: str = Query("overall", pattern="^(" + "|".join(DERIVED_FIELDS) + ")$"),
+    position: Optional[str] = Query(None, pattern="^(DEF|MID|ATT)$"),
+    min: Optional[float] = Query(None, ge=0, le=99),
+    limit: int = Query(20, ge=1, le=200),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Players sorted by a derived rating (overall, positionRating, attack or defence), optionally filtered"""
+    players = await ranked_players(db, by, position, min, limit)
+    return _json(_player_list.dump_json(players))
 
 @router.get("/{player_id}", response_model=Player)
 async def get_player(player_id: str, db: AsyncIOMotorDatabase = Depends(get_database)):
@@ -27,7 +104,21 @@ async def get_player(player_id: str, db: AsyncIOMotorDatabase = Depends(get_data
     player = await db.players.find_one({"id": player_id})
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
-    return Player(**player)
+    return _json(player_from_db(player).model_dump_json())
+
+@router.get("/{player_id}/similar")
+async def similar_players(
+    player_id: str,
+    k: int = Query(5, ge=1, le=MAX_K),
+    samePosition: bool = False,
+    subscribedOnly: bool = False,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Players with the closest position, points and skills profile, e.g. to replace a dropout"""
+    similar = (await fresh_similarity_index(db)).similar(player_id, k, samePosition, subscribedOnly)
+    if similar is None:
+        raise HTTPException(status_code=404, detail="Player not found")
+    return similar
 
 @router.post("/", response_model=Player)
 async def create_player(player_data: PlayerCreate, db: AsyncIOMotorDatabase = Depends(get_database)):
@@ -42,6 +133,7 @@ async def create_player(player_data: PlayerCreate, db: AsyncIOMotorDatabase = De
     
     # Insert into database
     await db.players.insert_one(player.dict())
+    await roster_events.publish("create", player.id, player.dict())
     
     return player
 
@@ -52,33 +144,16 @@ async def update_player(
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
     """Update a player"""
-    # Check if player exists
-    existing = await db.players.find_one({"id": player_id})
-    if not existing:
-        raise HTTPException(status_code=404, detail="Player not found")
-    
-    # Prepare update data (only include non-None fields)
-    update_data = {k: v for k, v in player_data.dict().items() if v is not None}
-    update_data["updated_at"] = datetime.utcnow()
-    
-    # Check name uniqueness if name is being updated
-    if "name" in update_data:
-        name_exists = await db.players.find_one({
-            "name": update_data["name"],
-            "id": {"$ne": player_id}
-        })
-        if name_exists:
-            raise HTTPException(status_code=400, detail="Player name already exists")
-    
-    # Update player
-    await db.players.update_one(
-        {"id": player_id},
-        {"$set": update_data}
-    )
+    try:
+        await apply_player_update(db, player_id, player_data)
+    except PlayerNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     # Return updated player
     updated_player = await db.players.find_one({"id": player_id})
-    return Player(**updated_player)
+    return _json(player_from_db(updated_player).model_dump_json())
 
 @router.delete("/{player_id}")
 async def delete_player(player_id: str, db: AsyncIOMotorDatabase = Depends(get_database)):
@@ -86,6 +161,9 @@ async def delete_player(player_id: str, db: AsyncIOMotorDatabase = Depends(get_d
     result = await db.players.delete_one({"id": player_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Player not found")
+    # Offline clients learn about the deletion from /changes
+    await record_tombstone(db, player_id)
+    await roster_events.publish("delete", player_id)
     
     return {"message": "Player deleted successfully"}
 
@@ -106,6 +184,7 @@ async def import_players(players_data: List[PlayerCreate], db: AsyncIOMotorDatab
             # Create and insert player
             player = Player(**player_data.dict())
             await db.players.insert_one(player.dict())
+            await roster_events.publish("create", player.id, player.dict())
             created_players.append(player)
             
         except Exception as e:
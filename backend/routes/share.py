@@ -0,0 +1,30 @@
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import PlainTextResponse
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from database import get_database
+from models.shuffle import ShareCreate
+from services.share_service import create_share, share_text, ShareNotFound
+
+router = APIRouter(prefix="/api", tags=["share"])
+
+@router.post("/share")
+async def create_share_link(share: ShareCreate, db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Render a confirmed or seeded shuffle as a WhatsApp message and get a short link to it"""
+    try:
+        created = await create_share(db, share)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ShareNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {**created, "url": f"/api/s/{created['code']}"}
+
+@router.get("/s/{code}", response_class=PlainTextResponse)
+async def open_share_link(code: str, db: AsyncIOMotorDatabase = Depends(get_database)):
+    """The rendered share message"""
+    try:
+        text = await share_text(db, code)
+    except ShareNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return PlainTextResponse(text, headers={"Cache-Control": "public, max-age=300"})
+
@@ -1,34 +1,42 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from typing import List, Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import random
 
-from models.player import Player
-from services.shuffle_service import shuffle_teams
-
-def get_database():
-    from server import db
-    return db
+from database import get_database
+from models.player import player_from_db
+from models.shuffle import ShuffleConstraints
+from services.constraint_service import (
+    shuffle_teams_constrained, SearchBudgetExceeded, EXHAUSTIVE_MAX_NODES, GREEDY_MAX_NODES
+)
+from services.executor import shuffle_executor, PoolBusyError
+from services.singleflight import shuffle_flight
+from services.shuffle_service import shuffle_teams, select_pool, POOL_PROJECTION, SQUAD_SIZE
 
 router = APIRouter(prefix="/api", tags=["shuffle"])
 
 @router.post("/shuffle")
-async def shuffle_teams_endpoint(db: AsyncIOMotorDatabase = Depends(get_database)):
-    """Shuffle all players into two balanced teams"""
+async def shuffle_teams_endpoint(
+    date: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Shuffle the subscribed players available on `date` into two balanced teams"""
     
-    # Get all players from database
-    players_data = await db.players.find().to_list(1000)
+    # Only the fields needed to pick the squad, via the (isSubscribed, availableDates) index
+    query = {"isSubscribed": True}
+    if date:
+        query["availableDates"] = date
+    candidates = await db.players.find(query, POOL_PROJECTION).to_list(None)
     
-    if len(players_data) != 16:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Exactly 16 players are required for shuffling. Found {len(players_data)} players."
-        )
+    try:
+        selected_ids = select_pool(candidates)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    players_data = await db.players.find({"id": {"$in": selected_ids}}).to_list(SQUAD_SIZE)
     
     # Convert to Player objects
-    players = [Player(**player_data) for player_data in players_data]
+    players = [player_from_db(player_data) for player_data in players_data]
     
     try:
         # Shuffle teams
@@ -41,8 +49,12 @@ async def shuffle_teams_endpoint(db: AsyncIOMotorDatabase = Depends(get_database
         raise HTTPException(status_code=500, detail=f"Error shuffling teams: {str(e)}")
 
 @router.post("/shuffle/custom")
-async def shuffle_custom_players(player_ids: List[str], db: AsyncIOMotorDatabase = Depends(get_database)):
-    """Shuffle specific players into teams by their IDs"""
+async def shuffle_custom_players(
+    player_ids: List[str],
+    seed: Optional[int] = None,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Shuffle specific players into teams by their IDs (pass `seed` for a reproducible shuffle)"""
     
     if len(player_ids) != 16:
         raise HTTPException(
@@ -50,6 +62,15 @@ async def shuffle_custom_players(player_ids: List[str], db: AsyncIOMotorDatabase
             detail=f"Exactly 16 player IDs are required. Received {len(player_ids)}."
         )
     
+    if seed is None:
+        # Every unseeded request is its own random draw
+        return await _shuffle_custom(player_ids, seed, db)
+    
+    # Concurrent seeded requests for the same players share one lookup and one shuffle
+    key = (tuple(sorted(player_ids)), seed)
+    return await shuffle_flight.do(key, lambda: _shuffle_custom(player_ids, seed, db))
+
+async def _shuffle_custom(player_ids: List[str], seed: Optional[int], db: AsyncIOMotorDatabase):
     # Get players by IDs
     players_data = await db.players.find({"id": {"$in": player_ids}}).to_list(1000)
     
@@ -61,14 +82,76 @@ async def shuffle_custom_players(player_ids: List[str], db: AsyncIOMotorDatabase
         )
     
     # Convert to Player objects
-    players = [Player(**player_data) for player_data in players_data]
+    players = [player_from_db(player_data) for player_data in players_data]
     
     try:
         # Shuffle teams
-        result = shuffle_teams(players)
+        result = shuffle_teams(players, random.Random(seed) if seed is not None else None)
         return result
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error shuffling teams: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error shuffling teams: {str(e)}")
+
+@router.post("/shuffle/constrained")
+async def shuffle_constrained_players(
+    constraints: ShuffleConstraints,
+    response: Response,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Shuffle specific players into balanced teams, honouring keep-together/keep-apart pairs"""
+    
+    player_ids = list(dict.fromkeys(constraints.playerIds))
+    players_data = await db.players.find({"id": {"$in": player_ids}}).to_list(len(player_ids))
+    
+    if len(players_data) != len(player_ids):
+        missing_ids = set(player_ids) - {p["id"] for p in players_data}
+        raise HTTPException(
+            status_code=404,
+            detail=f"Some players not found. Missing IDs: {list(missing_ids)}"
+        )
+    
+    players = [player_from_db(player_data) for player_data in players_data]
+    options = {
+        "must_link": constraints.mustLink,
+        "cannot_link": constraints.cannotLink,
+        "min_positions": constraints.minPositions,
+    }
+    # Hard stop at the time limit, even if nothing valid was found yet
+    search = {"deadline_ms": constraints.timeLimitMs}
+    if constraints.exhaustive:
+        # Leave part of the time limit for queueing and moving the result between processes
+        search["time_budget_ms"] = constraints.timeLimitMs * 0.8
+        search["max_nodes"] = EXHAUSTIVE_MAX_NODES
+    
+    try:
+        # The search runs in the process pool; past the time limit answer with a greedy split,
+        # which is one bounded descent and cheap enough to compute on the event loop
+        result, used_fallback = await shuffle_executor.run(
+            shuffle_teams_constrained,
+            players,
+            timeout=constraints.timeLimitMs / 1000,
+            fallback=lambda: shuffle_teams_constrained(
+                players, time_budget_ms=0, max_nodes=GREEDY_MAX_NODES, **options
+            ),
+            **options,
+            **search,
+        )
+        if used_fallback:
+            response.headers["X-Shuffle-Fallback"] = "greedy"
+        return result
+        
+    except SearchBudgetExceeded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except PoolBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error shuffling teams: {str(e)}")
+
+@router.get("/shuffle/pool")
+async def shuffle_pool_stats():
+    """Process pool load: pending jobs, completions, timeouts and rejections"""
+    return shuffle_executor.stats()
@@ -1,29 +1,21 @@
 from fastapi import FastAPI, APIRouter, Depends
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-import os
+from motor.motor_asyncio import AsyncIOMotorDatabase
+import database
+from database import get_database, get_db
 import logging
 from pathlib import Path
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
-
 # Create the main app without a prefix
 app = FastAPI(title="Football Team Shuffler API", version="1.0.0")
 
 # Create a router with the /api prefix for basic routes
 api_router = APIRouter(prefix="/api")
 
-# Database dependency
-async def get_database() -> AsyncIOMotorDatabase:
-    return db
-
 # Basic health check route
 @api_router.get("/")
 async def root():
@@ -40,12 +32,46 @@ async def health_check(database: AsyncIOMotorDatabase = Depends(get_database)):
         return {"status": "unhealthy", "database": "disconnected", "error": str(e)}
 
 # Import and include routers after app creation
-from routes import players, shuffle
+from routes import players, shuffle, history, matches, photos, share, jobs, bootstrap
+from services.executor import shuffle_executor
+from services.singleflight import coalescing_stats
+from services.events import roster_events
+from services.player_service import backfill_derived_ratings
+from services.search_service import load_search_index
+from services.similarity_service import load_similarity_index
+from services.job_service import job_runner
+from services.cache import cache
+
+# Request coalescing counters
+@api_router.get("/metrics/coalescing")
+async def coalescing_metrics():
+    return coalescing_stats()
+
+# Roster event stream counters
+@api_router.get("/metrics/events")
+async def event_metrics():
+    return roster_events.stats()
+
+# Cache hits and misses by namespace
+@api_router.get("/metrics/cache")
+async def cache_metrics():
+    return cache.stats()
+
+# Background job counters
+@api_router.get("/metrics/jobs")
+async def job_metrics():
+    return job_runner.stats()
 
 # Include routers
 app.include_router(api_router)
 app.include_router(players.router)
 app.include_router(shuffle.router)
+app.include_router(history.router)
+app.include_router(matches.router)
+app.include_router(photos.router)
+app.include_router(share.router)
+app.include_router(jobs.router)
+app.include_router(bootstrap.router)
 
 app.add_middleware(
     CORSMiddleware,
@@ -62,6 +88,39 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def create_indexes():
+    await database.create_indexes(get_db())
+
+@app.on_event("startup")
+async def backfill_players():
+    # Players stored before the derived ratings existed would sort last in /api/players/ranked;
+    # a no-op once every player is on the current schema
+    updated, errors = await backfill_derived_ratings(get_db())
+    if updated:
+        logger.info("Stored derived ratings for %d players", updated)
+    for error in errors:
+        logger.warning("Could not backfill derived ratings: %s", error)
+
+@app.on_event("startup")
+async def build_player_indexes():
+    await load_search_index(get_db())
+    await load_similarity_index(get_db())
+
+@app.on_event("startup")
+async def recover_jobs():
+    interrupted = await job_runner.recover(get_db())
+    if interrupted:
+        logger.warning("Marked %d unfinished jobs from a previous run as interrupted", interrupted)
+
+@app.on_event("shutdown")
+async def stop_jobs():
+    await job_runner.shutdown()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    database.close()
+
+@app.on_event("shutdown")
+async def shutdown_shuffle_pool():
+    shuffle_executor.shutdown()
\ No newline at end of file
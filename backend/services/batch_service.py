@@ -0,0 +1,100 @@
+import asyncio
+import random
+
+from typing import Any, Dict, List
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from models.job import BatchShuffleItem, BulkPlayerUpdate
+from models.player import PlayerCreate, player_from_db
+from services.job_service import JobContext
+from services.player_service import PlayerNotFound, insert_new_players, insert_players, update_player
+from services.shuffle_service import shuffle_teams
+from services.spreadsheet_service import read_chunks, validate_chunk
+
+# Rows per insert_many, and per progress update
+IMPORT_BATCH_SIZE = 500
+PROGRESS_BATCH_SIZE = 50
+
+async def import_players_job(db: AsyncIOMotorDatabase, players: List[PlayerCreate], ctx: JobContext) -> Dict[str, Any]:
+    """Insert players in batches, skipping taken names"""
+    created = 0
+    for start in range(0, len(players), IMPORT_BATCH_SIZE):
+        batch = players[start:start + IMPORT_BATCH_SIZE]
+        inserted, errors = await insert_players(db, batch, first_row=start + 1)
+        created += len(inserted)
+        await ctx.progress(succeeded=len(inserted), failed=len(errors), errors=errors)
+    return {"created": created}
+
+async def import_file_job(db: AsyncIOMotorDatabase, path: str, kind: str, ctx: JobContext) -> Dict[str, Any]:
+    """
+    Import a CSV or XLSX roster chunk by chunk: each chunk is validated column-wise and its
+    valid rows inserted in batches, so memory stays bounded by the chunk size.
+    """
+    created = 0
+    row = 2  # spreadsheet row of the first data row, below the header
+    chunks = read_chunks(path, kind)
+    try:
+        # Parsing and validation are CPU-bound; keep them off the event loop
+        while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+            players, rows, errors = await asyncio.to_thread(validate_chunk, chunk, row)
+            row += len(chunk)
+            ctx.job.total += len(players) + len(errors)
+            await ctx.progress(failed=len(errors), errors=errors)
+            for start in range(0, len(players), IMPORT_BATCH_SIZE):
+                inserted, errors = await insert_new_players(
+                    db, players[start:start + IMPORT_BATCH_SIZE], rows[start:start + IMPORT_BATCH_SIZE]
+                )
+                created += len(inserted)
+                await ctx.progress(succeeded=len(inserted), failed=len(errors), errors=errors)
+    finally:
+        chunks.close()
+    return {"created": created}
+
+async def bulk_update_job(db: AsyncIOMotorDatabase, updates: List[BulkPlayerUpdate], ctx: JobContext) -> Dict[str, Any]:
+    """Apply partial updates one player at a time, with the same rules as a single update"""
+    updated = 0
+    for item in updates:
+        try:
+            await update_player(db, item.id, item.update)
+        except (PlayerNotFound, ValueError) as e:
+            await ctx.progress(failed=1, errors=[f"{item.id}: {e}"])
+            continue
+        updated += 1
+        await ctx.progress(succeeded=1)
+    return {"updated": updated}
+
+async def batch_shuffle_job(db: AsyncIOMotorDatabase, items: List[BatchShuffleItem], ctx: JobContext) -> Dict[str, Any]:
+    """Shuffle each squad (reproducibly when seeded); results keep player ids, not full players"""
+    player_ids = list({player_id for item in items for player_id in item.playerIds})
+    players = {
+        p["id"]: player_from_db(p)
+        for p in await db.players.find({"id": {"$in": player_ids}}).to_list(None)
+    }
+
+    shuffles: List[Any] = []
+    succeeded = failed = 0
+    errors = []
+    for index, item in enumerate(items):
+        missing = [player_id for player_id in item.playerIds if player_id not in players]
+        if missing or len(set(item.playerIds)) != len(item.playerIds):
+            failed += 1
+            errors.append(f"Item {index + 1}: " + (f"players not found: {missing}" if missing else "a player is listed twice"))
+            shuffles.append(None)
+        else:
+            rng = random.Random(item.seed) if item.seed is not None else None
+            result = shuffle_teams([players[player_id] for player_id in item.playerIds], rng)
+            shuffles.append({
+                team: {
+                    "playerIds": [p["id"] for p in result[team]["players"]],
+                    "totalPoints": result[team]["totalPoints"],
+                    "formation": result[team]["formation"],
+                }
+                for team in ("team1", "team2")
+            })
+            succeeded += 1
+
+        if (index + 1) % PROGRESS_BATCH_SIZE == 0 or index + 1 == len(items):
+            await ctx.progress(succeeded=succeeded, failed=failed, errors=errors)
+            succeeded = failed = 0
+            errors = []
+            await asyncio.sleep(0)  # let requests in between batches
+    return {"shuffles": shuffles}
@@ -0,0 +1,62 @@
+import asyncio
+import hashlib
+import json
+
+from typing import Any, Dict, Optional, Tuple
+from fastapi.encoders import jsonable_encoder
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from models.player import DERIVED_FIELDS
+from services.cache import ROSTER, cache
+from services.singleflight import bootstrap_flight
+from services.stats_service import roster_stats
+
+# What the home page and roster cards render; timestamps, availability and rating
+# history stay behind /api/players/{id}
+ROSTER_FIELDS = (
+    "id", "name", "position", "points", "photo", "skills", "age",
+    "preferredFoot", "nationality", "isSubscribed", "rating", *DERIVED_FIELDS,
+)
+ROSTER_PROJECTION = {"_id": 0, **{field: 1 for field in ROSTER_FIELDS}}
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in {tag.strip().removeprefix("W/").strip('"') for tag in if_none_match.split(",")}
+
+async def latest_shuffle(db: AsyncIOMotorDatabase) -> Optional[Dict[str, Any]]:
+    return await db.shuffles.find_one({}, {"_id": 0}, sort=[("created_at", -1), ("id", -1)])
+
+async def bootstrap(db: AsyncIOMotorDatabase) -> Tuple[str, str]:
+    """
+    Everything the app needs for its first paint, as (JSON body, ETag): the projected
+    roster, the latest confirmed shuffle and the roster stats. Served from the cache,
+    so revalidating an unchanged bootstrap (a 304) reads nothing from the database.
+    Confirming a shuffle publishes roster events for its players, so the ROSTER
+    generation covers the latest shuffle as well as the roster and stats.
+    """
+    generation = await cache.generation(ROSTER)
+    cached = await cache.get(ROSTER, "bootstrap")
+    if cached is not None:
+        body, etag = cached
+        return body, etag
+    # Concurrent misses share one set of reads
+    return await bootstrap_flight.do(generation, lambda: _build(db, generation))
+
+async def _build(db: AsyncIOMotorDatabase, generation: int) -> Tuple[str, str]:
+    # The three reads run concurrently; stats usually come from the cache
+    roster, shuffle, stats = await asyncio.gather(
+        db.players.find({}, ROSTER_PROJECTION).sort("name", 1).to_list(None),
+        latest_shuffle(db),
+        roster_stats(db),
+    )
+    body = json.dumps(
+        jsonable_encoder({"players": roster, "latestShuffle": shuffle, "stats": stats}),
+        sort_keys=True, separators=(",", ":")
+    )
+    # Keys are sorted, so the same roster, shuffle and stats always give the same tag
+    etag = hashlib.sha256(body.encode()).hexdigest()[:32]
+    # A list, so JSON-backed caches return it unchanged
+    await cache.set(ROSTER, "bootstrap", [body, etag], generation)
+    return body, etag
@@ -0,0 +1,242 @@
+import fcntl
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+from services.events import roster_events
+
+logger = logging.getLogger(__name__)
+
+# Everything derived from the players collection
+ROSTER = "players"
+
+class CacheBackend(ABC):
+    """
+    Namespaced cache with generation-based invalidation. invalidate(namespace) bumps the
+    namespace's generation, which drops every entry in it at once. Entries are stored
+    with the generation read before their value was computed, so a value computed
+    while a write landed is never served. Methods are coroutines because a backend may
+    live on another server.
+    """
+
+    @abstractmethod
+    async def generation(self, namespace: str) -> int:
+        ...
+
+    @abstractmethod
+    async def invalidate(self, namespace: str) -> int:
+        """Drop every entry of namespace; returns the new generation"""
+
+    @abstractmethod
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, namespace: str, key: str, value: Any, generation: int):
+        ...
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        ...
+
+class _LocalValues(CacheBackend):
+    """Values in a per-process LRU; subclasses decide where generations live"""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[int, Any]]" = OrderedDict()
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        entry = self._entries.get((namespace, key))
+        if entry is None or entry[0] != await self.generation(namespace):
+            self.misses[namespace] = self.misses.get(namespace, 0) + 1
+            return None
+        self._entries.move_to_end((namespace, key))
+        self.hits[namespace] = self.hits.get(namespace, 0) + 1
+        return entry[1]
+
+    async def set(self, namespace: str, key: str, value: Any, generation: int):
+        if generation != await self.generation(namespace):
+            return  # computed from data that has changed since
+        self._entries[(namespace, key)] = (generation, value)
+        self._entries.move_to_end((namespace, key))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self).__name__,
+            "entries": len(self._entries),
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+        }
+
+class MemoryCache(_LocalValues):
+    """Single-process cache: generations are plain counters"""
+
+    def __init__(self, max_entries: int = 2048):
+        super().__init__(max_entries)
+        self._generations: Dict[str, int] = {}
+
+    async def generation(self, namespace: str) -> int:
+        return self._generations.get(namespace, 0)
+
+    async def invalidate(self, namespace: str) -> int:
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        # Entries of the old generation can never be served again
+        for cache_key in [k for k in self._entries if k[0] == namespace]:
+            del self._entries[cache_key]
+        return self._generations[namespace]
+
+class SharedMemoryCache(_LocalValues):
+    """
+    Cache for several worker processes on one host. Generations are 64-bit counters in a
+    memory-mapped file shared by every worker: an invalidation is an increment under an
+    exclusive flock, and every worker sees it on its next read, with no messaging.
+    Values stay in each worker's LRU and are checked against the shared generation on
+    every get. Namespaces hash into a fixed number of slots; a collision only means an
+    extra invalidation.
+    """
+
+    SLOTS = 256
+    _COUNTER = struct.Struct("<Q")
+
+    def __init__(self, path: str, max_entries: int = 2048):
+        super().__init__(max_entries)
+        self.path = path
+        size = self.SLOTS * self._COUNTER.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._locked():
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+
+    @contextmanager
+    def _locked(self):
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _offset(self, namespace: str) -> int:
+        return (zlib.crc32(namespace.encode()) % self.SLOTS) * self._COUNTER.size
+
+    async def generation(self, namespace: str) -> int:
+        return self._COUNTER.unpack_from(self._map, self._offset(namespace))[0]
+
+    async def invalidate(self, namespace: str) -> int:
+        offset = self._offset(namespace)
+        with self._locked():
+            generation = self._COUNTER.unpack_from(self._map, offset)[0] + 1
+            self._COUNTER.pack_into(self._map, offset, generation)
+        return generation
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+class RedisCache(CacheBackend):
+    """
+    Cache shared through Redis (or a compatible server): values and generations both
+    live on the server, so workers on different hosts share entries too.
+    Values must be JSON-serializable. The redis package is only needed for this backend;
+    its asyncio client is used, so a slow server never blocks the event loop.
+    """
+
+    def __init__(self, url: str, ttl_seconds: int = 3600, prefix: str = "footbally:", client=None):
+        if client is None:
+            import redis.asyncio
+            client = redis.asyncio.Redis.from_url(url)
+        self._redis = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+    async def generation(self, namespace: str) -> int:
+        return int(await self._redis.get(f"{self.prefix}gen:{namespace}") or 0)
+
+    async def invalidate(self, namespace: str) -> int:
+        return int(await self._redis.incr(f"{self.prefix}gen:{namespace}"))
+
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        raw = await self._redis.get(f"{self.prefix}{namespace}:{await self.generation(namespace)}:{key}")
+        if raw is None:
+            self.misses[namespace] = self.misses.get(namespace, 0) + 1
+            return None
+        self.hits[namespace] = self.hits.get(namespace, 0) + 1
+        return json.loads(raw)
+
+    async def set(self, namespace: str, key: str, value: Any, generation: int):
+        # Keyed by generation, so a value computed before an invalidation is simply never read
+        await self._redis.set(f"{self.prefix}{namespace}:{generation}:{key}", json.dumps(value), ex=self.ttl_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__, "hits": dict(self.hits), "misses": dict(self.misses)}
+
+class GenerationTracker:
+    """
+    Tells an in-process index (kept current from local roster events) whether another
+    worker changed its namespace since it last loaded. Each local event accounts for
+    one bump of the shared generation; any bump beyond those came from elsewhere.
+    """
+
+    def __init__(self, backend: CacheBackend, namespace: str):
+        self._backend = backend
+        self.namespace = namespace
+        self._seen: Optional[int] = None
+        self._local = 0
+
+    async def begin_load(self) -> int:
+        """Call before reading the data to load; pass the result to loaded()"""
+        return await self._backend.generation(self.namespace)
+
+    def loaded(self, generation: int):
+        self._seen = generation
+        self._local = 0
+
+    def local_change(self):
+        self._local += 1
+
+    async def is_stale(self) -> bool:
+        if self._seen is None:
+            return True
+        current = await self._backend.generation(self.namespace)
+        if current == self._seen + self._local:
+            self._seen, self._local = current, 0
+            return False
+        return True
+
+def _default_shm_path() -> str:
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, "footbally-cache-generations")
+
+def create_cache() -> CacheBackend:
+    """Backend chosen by CACHE_BACKEND: memory (default), shared or redis"""
+    kind = os.environ.get("CACHE_BACKEND", "memory")
+    max_entries = int(os.environ.get("CACHE_MAX_ENTRIES", "2048"))
+    if kind == "shared":
+        return SharedMemoryCache(os.environ.get("CACHE_SHM_PATH") or _default_shm_path(), max_entries)
+    if kind == "redis":
+        return RedisCache(os.environ.get("CACHE_REDIS_URL", "redis://localhost:6379/0"))
+    if kind != "memory":
+        logger.warning("Unknown CACHE_BACKEND %r, using memory", kind)
+    return MemoryCache(max_entries)
+
+cache = create_cache()
+
+# Any player write, in any worker, drops roster-derived entries everywhere
+async def _invalidate_roster(event: Dict[str, Any]):
+    await cache.invalidate(ROSTER)
+
+roster_events.add_listener(_invalidate_roster)
@@ -0,0 +1,265 @@
+import random
+import time
+
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from models.player import Player
+from services.shuffle_service import build_result, TEAM_POSITION_MINIMUMS
+
+POSITIONS = ("DEF", "MID", "ATT")
+
+# Search limits: stop improving balance after the time budget,
+# give up entirely after max_nodes or the hard deadline
+DEFAULT_TIME_BUDGET_MS = 5.0
+MAX_NODES = 200_000
+EXHAUSTIVE_MAX_NODES = 20_000_000
+# A single greedy descent with a little backtracking; cheap enough to run on the event loop
+GREEDY_MAX_NODES = 256
+
+class SearchBudgetExceeded(Exception):
+    """The search ran out of nodes or time before finding any valid assignment"""
+
+class _Group:
+    """Players that must end up on the same team"""
+
+    def __init__(self, members: List[Player]):
+        self.members = members
+        self.size = len(members)
+        self.points = sum(p.points for p in members)
+        self.counts = {pos: sum(1 for p in members if p.position == pos) for pos in POSITIONS}
+        self.conflicts = set()  # indices of groups that must be on the other team
+
+class _Side:
+    """Groups of a conflict component that end up on the same team"""
+
+    def __init__(self, groups: List[_Group]):
+        self.members = [p for g in groups for p in g.members]
+        self.size = sum(g.size for g in groups)
+        self.points = sum(g.points for g in groups)
+        self.counts = {pos: sum(g.counts[pos] for g in groups) for pos in POSITIONS}
+
+class _Unit:
+    """
+    A component of the cannot-link graph between groups. It is two-coloured, so
+    once one group is placed the whole component is: the search only chooses
+    which side goes to team 1.
+    """
+
+    def __init__(self, side_a: List[_Group], side_b: List[_Group]):
+        self.sides = (_Side(side_a), _Side(side_b))
+
+def _conflict_units(groups: List[_Group]) -> List[_Unit]:
+    """Split groups into cannot-link components, raising ValueError on an odd cycle"""
+    colour: Dict[int, int] = {}
+    units = []
+    for start in range(len(groups)):
+        if start in colour:
+            continue
+        colour[start] = 0
+        sides = ([], [])
+        stack = [start]
+        while stack:
+            index = stack.pop()
+            sides[colour[index]].append(groups[index])
+            for other in groups[index].conflicts:
+                if other not in colour:
+                    colour[other] = 1 - colour[index]
+                    stack.append(other)
+                elif colour[other] == colour[index]:
+                    names = ", ".join(p.name for p in groups[index].members + groups[other].members)
+                    raise ValueError(
+                        f"No team assignment satisfies the given constraints: "
+                        f"keep-apart pairs form an odd cycle ({names})"
+                    )
+        units.append(_Unit(*sides))
+    return units
+
+def _reachable_sizes(units: List[_Unit]) -> int:
+    """Bitmask of the team 1 sizes reachable by choosing a side of every unit"""
+    reachable = 1
+    for u in units:
+        reachable = (reachable << u.sides[0].size) | (reachable << u.sides[1].size)
+    return reachable
+
+def _link_groups(players: List[Player], must_link: Iterable[Tuple[str, str]]) -> List[List[Player]]:
+    """Union-find over must-link pairs, returning the connected components"""
+    parent = {p.id: p.id for p in players}
+
+    def find(player_id: str) -> str:
+        while parent[player_id] != player_id:
+            parent[player_id] = parent[parent[player_id]]
+            player_id = parent[player_id]
+        return player_id
+
+    for a, b in must_link:
+        parent[find(a)] = find(b)
+
+    components: Dict[str, List[Player]] = {}
+    for p in players:
+        components.setdefault(find(p.id), []).append(p)
+    return list(components.values())
+
+def shuffle_teams_constrained(
+    players: List[Player],
+    must_link: Iterable[Tuple[str, str]] = (),
+    cannot_link: Iterable[Tuple[str, str]] = (),
+    min_positions: Optional[Dict[str, int]] = None,
+    time_budget_ms: float = DEFAULT_TIME_BUDGET_MS,
+    max_nodes: int = MAX_NODES,
+    deadline_ms: Optional[float] = None,
+    rng: Optional[random.Random] = None,
+) -> Dict[str, Any]:
+    """
+    Split players into two equal teams, balanced by total points, such that:
+    - every must-link pair is on the same team
+    - every cannot-link pair is on opposite teams
+    - each team has at least `min_positions[pos]` players of each position
+    Raises ValueError when no such assignment exists, and SearchBudgetExceeded when
+    max_nodes or deadline_ms (a hard limit, unlike time_budget_ms) ran out first.
+    """
+    rng = rng or random.Random()
+    min_positions = TEAM_POSITION_MINIMUMS if min_positions is None else min_positions
+    must_link = list(must_link)
+    cannot_link = list(cannot_link)
+
+    if len(players) % 2:
+        raise ValueError("An even number of players is required for team shuffle")
+    team_size = len(players) // 2
+
+    unknown = {pos for pos in min_positions if pos not in POSITIONS}
+    if unknown:
+        raise ValueError(f"Unknown positions in minimums: {sorted(unknown)}")
+
+    player_ids = {p.id for p in players}
+    for a, b in must_link + cannot_link:
+        for player_id in (a, b):
+            if player_id not in player_ids:
+                raise ValueError(f"Constraint refers to a player not in the shuffle: {player_id}")
+
+    groups = [_Group(members) for members in _link_groups(players, must_link)]
+    group_of = {p.id: i for i, g in enumerate(groups) for p in g.members}
+
+    for g in groups:
+        if g.size > team_size:
+            names = ", ".join(p.name for p in g.members)
+            raise ValueError(f"Too many players must play together ({names}); a team has {team_size} places")
+
+    for a, b in cannot_link:
+        ga, gb = group_of[a], group_of[b]
+        if ga == gb:
+            raise ValueError(f"Players {a} and {b} are linked to the same team but must be kept apart")
+        groups[ga].conflicts.add(gb)
+        groups[gb].conflicts.add(ga)
+
+    for pos, minimum in min_positions.items():
+        available = sum(g.counts[pos] for g in groups)
+        if available < 2 * minimum:
+            raise ValueError(f"At least {2 * minimum} {pos} players are required, found {available}")
+
+    units = _conflict_units(groups)
+
+    # Team sizes must be reachable: each unit puts one of its two sides on team 1
+    if not (_reachable_sizes(units) >> team_size) & 1:
+        raise ValueError("No team assignment satisfies the given constraints: teams cannot be made equal in size")
+
+    # Largest units first; random order among equals so repeated shuffles differ
+    rng.shuffle(units)
+    units.sort(key=lambda u: u.sides[0].size + u.sides[1].size, reverse=True)
+
+    # Suffix aggregates over the search order, used for pruning
+    remaining_points = [0] * (len(units) + 1)
+    remaining_counts = [dict.fromkeys(POSITIONS, 0) for _ in range(len(units) + 1)]
+    reachable = [1] * (len(units) + 1)  # bit s set: team 1 can still gain exactly s players
+    for depth in range(len(units) - 1, -1, -1):
+        u = units[depth]
+        remaining_points[depth] = remaining_points[depth + 1] + u.sides[0].points + u.sides[1].points
+        remaining_counts[depth] = {
+            pos: remaining_counts[depth + 1][pos] + u.sides[0].counts[pos] + u.sides[1].counts[pos]
+            for pos in POSITIONS
+        }
+        reachable[depth] = (reachable[depth + 1] << u.sides[0].size) | (reachable[depth + 1] << u.sides[1].size)
+
+    orientation = [0] * len(units)
+    sizes = [0, 0]
+    points = [0, 0]
+    counts = [dict.fromkeys(POSITIONS, 0), dict.fromkeys(POSITIONS, 0)]
+    best = {"diff": None, "orientation": None}
+    started = time.perf_counter()
+    deadline = started + time_budget_ms / 1000
+    hard_deadline = started + deadline_ms / 1000 if deadline_ms is not None else None
+    nodes = 0
+    exhausted = False
+
+    def feasible(depth: int) -> bool:
+        if sizes[0] > team_size or sizes[1] > team_size:
+            return False
+        if not (reachable[depth] >> (team_size - sizes[0])) & 1:
+            return False
+        rest = remaining_counts[depth]
+        needs = [0, 0]
+        for pos, minimum in min_positions.items():
+            need0 = max(0, minimum - counts[0][pos])
+            need1 = max(0, minimum - counts[1][pos])
+            if need0 + need1 > rest[pos]:
+                return False
+            needs[0] += need0
+            needs[1] += need1
+        return needs[0] <= team_size - sizes[0] and needs[1] <= team_size - sizes[1]
+
+    def place(u: _Unit, flip: int, sign: int):
+        for team in (0, 1):
+            side = u.sides[team ^ flip]
+            sizes[team] += sign * side.size
+            points[team] += sign * side.points
+            for pos in POSITIONS:
+                counts[team][pos] += sign * side.counts[pos]
+
+    def search(depth: int) -> bool:
+        """Returns True when the search should stop"""
+        nonlocal nodes, exhausted
+        nodes += 1
+        if nodes > max_nodes or (
+            hard_deadline is not None and nodes % 64 == 0 and time.perf_counter() > hard_deadline
+        ):
+            exhausted = True
+            return True
+        if best["diff"] is not None and time.perf_counter() > deadline:
+            return True
+
+        diff = abs(points[0] - points[1])
+        if best["diff"] is not None and diff - remaining_points[depth] >= best["diff"]:
+            return False
+
+        if depth == len(units):
+            best["diff"] = diff
+            best["orientation"] = list(orientation)
+            return diff <= 1
+
+        u = units[depth]
+        # Heavier side to the lighter team first, so the first complete assignment is the greedy one
+        heavy = 0 if u.sides[0].points >= u.sides[1].points else 1
+        flips = (heavy, 1 - heavy) if points[0] <= points[1] else (1 - heavy, heavy)
+        if depth == 0:
+            flips = flips[:1]  # teams are interchangeable
+
+        for flip in flips:
+            orientation[depth] = flip
+            place(u, flip, 1)
+            stop = feasible(depth + 1) and search(depth + 1)
+            place(u, flip, -1)
+            if stop:
+                return True
+        return False
+
+    if feasible(0):
+        search(0)
+
+    if best["orientation"] is None:
+        if exhausted:
+            raise SearchBudgetExceeded("No valid team assignment found within the search budget")
+        raise ValueError("No team assignment satisfies the given constraints")
+
+    team1, team2 = [], []
+    for u, flip in zip(units, best["orientation"]):
+        team1.extend(u.sides[flip].members)
+        team2.extend(u.sides[1 - flip].members)
+    return build_result(team1, team2)
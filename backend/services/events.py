@@ -0,0 +1,110 @@
+import asyncio
+import inspect
+import json
+import logging
+import uuid
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple, Union
+from fastapi.encoders import jsonable_encoder
+
+logger = logging.getLogger(__name__)
+
+# Called with every event: in-process indexes update synchronously, caches may await their backend
+Listener = Callable[[Dict[str, Any]], Union[None, Awaitable[None]]]
+
+class RosterBroadcaster:
+    """
+    In-process fan-out of player change events to server-sent-event subscribers.
+    Each event is serialized once into an SSE frame and the same frame is queued for
+    every subscriber. A subscriber that falls behind loses its oldest frames rather
+    than slowing down writers; a short replay buffer serves reconnects with Last-Event-ID.
+    Event ids are "<epoch>-<n>" where the epoch is fixed per process, so a client whose
+    id comes from another process (or an earlier run) is told to reset instead of
+    silently missing events.
+    """
+
+    def __init__(self, queue_size: int = 256, replay_size: int = 512):
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._listeners: List[Listener] = []
+        self._replay: Deque[Tuple[int, str]] = deque(maxlen=replay_size)
+        self.epoch = uuid.uuid4().hex[:8]
+        self._last_id = 0
+        self.published = 0
+        self.dropped = 0
+
+    async def publish(self, change: str, player_id: str, fields: Optional[Dict[str, Any]] = None):
+        """
+        Broadcast a create/update/delete event carrying only the changed fields.
+        Returns once every listener has run, so caches are invalidated before the write's response.
+        """
+        self._last_id += 1
+        event = {"type": change, "id": player_id}
+        if fields is not None:
+            event["fields"] = fields
+        frame = self._frame("player", event, self._last_id)
+        self._replay.append((self._last_id, frame))
+        self.published += 1
+
+        for listener in self._listeners:
+            try:
+                result = listener(event)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                # A broken cache must not fail the write that triggered it
+                logger.exception("Roster event listener failed")
+
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(frame)
+
+    def _frame(self, name: str, event: Dict[str, Any], event_id: int) -> str:
+        data = json.dumps(jsonable_encoder(event))
+        return f"id: {self.epoch}-{event_id}\nevent: {name}\ndata: {data}\n\n"
+
+    def _replay_after(self, last_event_id: str) -> Optional[list]:
+        """Frames after last_event_id, or None when they can't be replayed"""
+        epoch, _, number = last_event_id.partition("-")
+        if epoch != self.epoch or not number.isdigit():
+            return None
+        after = int(number)
+        if after > self._last_id:
+            return None
+        if after < self._last_id and (not self._replay or self._replay[0][0] > after + 1):
+            return None  # fell out of the replay buffer
+        return [frame for event_id, frame in self._replay if event_id > after]
+
+    def add_listener(self, listener: Listener):
+        """Call listener(event), and await it if it is a coroutine function, for every published event"""
+        self._listeners.append(listener)
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> asyncio.Queue:
+        """
+        Register a subscriber queue. With a Last-Event-ID, missed frames are queued first;
+        if they can't be replayed the client gets a "reset" event and should refetch the roster.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        if last_event_id:
+            frames = self._replay_after(last_event_id)
+            if frames is None or len(frames) > self.queue_size:
+                frames = [self._frame("reset", {"type": "reset"}, self._last_id)]
+            for frame in frames:
+                queue.put_nowait(frame)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+            "lastEventId": self._last_id,
+        }
+
+roster_events = RosterBroadcaster()
@@ -0,0 +1,85 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional, Tuple
+
+class PoolBusyError(Exception):
+    """Raised when too many jobs are already waiting for the pool"""
+
+class ShuffleExecutor:
+    """
+    Runs CPU-bound shuffle work in a bounded process pool so it never blocks the event loop.
+    A job that misses its deadline is answered with the fallback (computed in-process);
+    the worker still finishes it, and it keeps counting towards the queue depth until it does.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def _job_done(self, _future: asyncio.Future):
+        self.pending -= 1
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        timeout: float,
+        fallback: Callable[[], Any],
+        **kwargs: Any
+    ) -> Tuple[Any, bool]:
+        """
+        Run fn(*args, **kwargs) in the pool. Returns (result, used_fallback).
+        Raises PoolBusyError when the queue is full; exceptions raised by fn propagate.
+        """
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PoolBusyError(f"Shuffle queue is full ({self.pending} jobs pending)")
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._get_pool(), partial(fn, *args, **kwargs))
+        self.pending += 1
+        future.add_done_callback(self._job_done)
+
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            # Nobody will read the late result; don't log it as an unretrieved exception
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            return fallback(), True
+
+        self.completed += 1
+        return result, False
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "maxPending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+_workers = int(os.environ.get("SHUFFLE_POOL_WORKERS", min(2, os.cpu_count() or 1)))
+shuffle_executor = ShuffleExecutor(
+    max_workers=_workers,
+    max_pending=int(os.environ.get("SHUFFLE_POOL_MAX_PENDING", 4 * _workers)),
+)
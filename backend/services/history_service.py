@@ -0,0 +1,128 @@
+from itertools import combinations
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
+from pymongo import UpdateOne
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from models.shuffle import ShuffleRecord, TeamRecord
+from services.events import roster_events
+
+def pair_key(a: str, b: str) -> str:
+    """Key of the teammate matrix cell for a pair of players (order-independent)"""
+    return f"{a}|{b}" if a < b else f"{b}|{a}"
+
+def teammate_updates(teams: List[List[str]]) -> List[UpdateOne]:
+    """One $inc per pair of players that shared a team"""
+    updates = []
+    for team in teams:
+        for a, b in combinations(sorted(set(team)), 2):
+            updates.append(UpdateOne(
+                {"_id": pair_key(a, b)},
+                {"$inc": {"count": 1}, "$setOnInsert": {"players": [a, b]}},
+                upsert=True
+            ))
+    return updates
+
+def team_record(player_ids: List[str], players: Dict[str, Dict[str, Any]]) -> TeamRecord:
+    """Compact team summary: ids, total points and formation"""
+    counts = {"DEF": 0, "MID": 0, "ATT": 0}
+    for player_id in player_ids:
+        counts[players[player_id]["position"]] += 1
+    return TeamRecord(
+        playerIds=player_ids,
+        totalPoints=sum(players[player_id]["points"] for player_id in player_ids),
+        formation=f"{counts['DEF']}-{counts['MID']}-{counts['ATT']}"
+    )
+
+async def record_shuffle(
+    db: AsyncIOMotorDatabase,
+    team1: List[str],
+    team2: List[str],
+    date: Optional[str] = None
+) -> ShuffleRecord:
+    """
+    Store a confirmed shuffle and fold it into the teammate co-occurrence matrix.
+    Raises ValueError if the teams overlap or refer to unknown players.
+    """
+    if len(set(team1)) != len(team1) or len(set(team2)) != len(team2):
+        raise ValueError("A player is listed twice in the same team")
+    if set(team1) & set(team2):
+        raise ValueError("A player cannot be on both teams")
+
+    player_ids = team1 + team2
+    players_data = await db.players.find(
+        {"id": {"$in": player_ids}},
+        {"_id": 0, "id": 1, "position": 1, "points": 1, "gamesPlayed": 1}
+    ).to_list(len(player_ids))
+    players = {p["id"]: p for p in players_data}
+
+    missing_ids = set(player_ids) - set(players)
+    if missing_ids:
+        raise ValueError(f"Some players not found. Missing IDs: {list(missing_ids)}")
+
+    record = ShuffleRecord(
+        team1=team_record(team1, players),
+        team2=team_record(team2, players),
+        date=date
+    )
+    await db.shuffles.insert_one(record.dict())
+
+    await db.teammates.bulk_write(teammate_updates([team1, team2]), ordered=False)
+
+    now = datetime.utcnow()
+    await db.players.update_many(
+        {"id": {"$in": player_ids}},
+        {"$inc": {"gamesPlayed": 1}, "$set": {"lastPlayedAt": now, "updated_at": now}}
+    )
+    # Keeps cached rosters (in every worker) and live clients current
+    for player_id in player_ids:
+        await roster_events.publish("update", player_id, {
+            "gamesPlayed": (players[player_id].get("gamesPlayed") or 0) + 1,
+            "lastPlayedAt": now,
+        })
+    return record
+
+async def teammate_count(db: AsyncIOMotorDatabase, a: str, b: str) -> int:
+    """How many confirmed shuffles had a and b on the same team"""
+    cell = await db.teammates.find_one({"_id": pair_key(a, b)}, {"count": 1})
+    return cell["count"] if cell else 0
+
+async def frequent_teammates(db: AsyncIOMotorDatabase, player_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """The players most often on the same team as player_id"""
+    cells = await db.teammates.find(
+        {"players": player_id}, {"_id": 0, "players": 1, "count": 1}
+    ).sort("count", -1).limit(limit).to_list(limit)
+    return [
+        {"playerId": next(p for p in cell["players"] if p != player_id), "count": cell["count"]}
+        for cell in cells
+    ]
+
+def encode_cursor(record: ShuffleRecord) -> str:
+    return f"{record.created_at.isoformat()}|{record.id}"
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Raises ValueError for a malformed cursor"""
+    created_at, sep, record_id = cursor.partition("|")
+    if not sep or not record_id:
+        raise ValueError("Invalid history cursor")
+    return datetime.fromisoformat(created_at), record_id
+
+async def shuffle_history(db: AsyncIOMotorDatabase, limit: int, before: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Newest-first page of confirmed shuffles, keyset-paginated on (created_at, id) so
+    records sharing a millisecond timestamp are not skipped at page boundaries.
+    """
+    query = {}
+    if before:
+        created_at, record_id = decode_cursor(before)
+        query = {"$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "id": {"$lt": record_id}},
+        ]}
+    docs = await db.shuffles.find(query, {"_id": 0}).sort(
+        [("created_at", -1), ("id", -1)]
+    ).limit(limit + 1).to_list(limit + 1)
+    items = [ShuffleRecord(**doc) for doc in docs[:limit]]
+    return {
+        "items": items,
+        "nextCursor": encode_cursor(items[-1]) if len(docs) > limit else None
+    }
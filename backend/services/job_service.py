@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import os
+import time
+
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from models.job import Job
+
+logger = logging.getLogger(__name__)
+
+MAX_JOB_ERRORS = 100
+# Progress is written to Mongo at most this often; subscribers see every update
+PERSIST_INTERVAL = 0.5
+# Finished jobs are kept this long
+JOB_TTL = timedelta(days=7)
+# Running jobs are heartbeated; one silent for HEARTBEAT_TIMEOUT lost its process
+HEARTBEAT_INTERVAL = 10.0
+HEARTBEAT_TIMEOUT = timedelta(seconds=3 * HEARTBEAT_INTERVAL)
+FINISHED = ("succeeded", "failed", "interrupted")
+
+class JobContext:
+    """Handed to a job body to report progress on its items"""
+
+    def __init__(self, runner: "JobRunner", db: AsyncIOMotorDatabase, job: Job):
+        self._runner = runner
+        self._db = db
+        self.job = job
+        self._persisted_at = 0.0
+
+    async def progress(self, succeeded: int = 0, failed: int = 0, errors=()):
+        job = self.job
+        job.succeeded += succeeded
+        job.failed += failed
+        job.processed += succeeded + failed
+        room = MAX_JOB_ERRORS - len(job.errors)
+        if room > 0:
+            job.errors.extend(list(errors)[:room])
+        self._runner._notify(job)
+        if time.monotonic() - self._persisted_at >= PERSIST_INTERVAL:
+            await self.persist()
+
+    async def persist(self):
+        self._persisted_at = time.monotonic()
+        await self._db.jobs.replace_one({"id": self.job.id}, self.job.dict())
+
+class JobRunner:
+    """
+    In-process background jobs with a cap on how many run at once.
+    Job state lives in the jobs collection, so status survives the process. Payloads are
+    only held in memory, so a job whose process stopped can't resume: the owning process
+    heartbeats its unfinished jobs, and one whose heartbeat went stale is marked
+    interrupted (on startup, or when it is looked up). Progress is pushed to subscriber
+    queues for the streaming feed.
+    """
+
+    def __init__(self, max_concurrent: int = 2, queue_size: int = 64):
+        self.max_concurrent = max_concurrent
+        self.queue_size = queue_size
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._jobs: Dict[str, Job] = {}  # live state of this process's unfinished jobs
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._heartbeat: Optional[asyncio.Task] = None
+        self.submitted = 0
+
+    async def submit(
+        self,
+        db: AsyncIOMotorDatabase,
+        job_type: str,
+        total: int,
+        body: Callable[[JobContext], Awaitable[Optional[Dict[str, Any]]]],
+        cleanup: Optional[Callable[[], None]] = None
+    ) -> Job:
+        """
+        Persist a queued job and start it in the background; body(ctx) returns the job result.
+        cleanup() runs once the job ends, including when it is cancelled before it started.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        job = Job(type=job_type, total=total, heartbeat_at=datetime.utcnow())
+        await db.jobs.insert_one(job.dict())
+        self.submitted += 1
+        task = asyncio.create_task(self._run(JobContext(self, db, job), body, cleanup))
+        self._tasks[job.id] = task
+        self._jobs[job.id] = job
+        task.add_done_callback(lambda _: self._forget(job.id))
+        if self._heartbeat is None or self._heartbeat.done():
+            self._heartbeat = asyncio.create_task(self._beat(db))
+        return job
+
+    def _forget(self, job_id: str):
+        self._tasks.pop(job_id, None)
+        self._jobs.pop(job_id, None)
+
+    async def _run(self, ctx: JobContext, body, cleanup=None):
+        try:
+            await self._execute(ctx, body)
+        finally:
+            if cleanup is not None:
+                try:
+                    cleanup()
+                except Exception:
+                    logger.exception("Cleanup of job %s failed", ctx.job.id)
+
+    async def _execute(self, ctx: JobContext, body):
+        job = ctx.job
+        async with self._semaphore:
+            job.status = "running"
+            job.started_at = datetime.utcnow()
+            self._notify(job)
+            await ctx.persist()
+            try:
+                job.result = await body(ctx)
+                job.status = "succeeded"
+            except asyncio.CancelledError:
+                job.status = "interrupted"
+                raise
+            except Exception as e:
+                logger.exception("Job %s failed", job.id)
+                job.status = "failed"
+                job.errors = (job.errors + [f"Job failed: {e}"])[-MAX_JOB_ERRORS:]
+            finally:
+                job.finished_at = datetime.utcnow()
+                self._notify(job)
+                await asyncio.shield(ctx.persist())
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Live state of a job running or queued in this process"""
+        return self._jobs.get(job_id)
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(job_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[job_id]
+
+    def _notify(self, job: Job):
+        snapshot = job.dict()
+        for queue in self._subscribers.get(job.id, ()):
+            if queue.full():
+                queue.get_nowait()  # a slow reader only needs the latest progress
+            queue.put_nowait(snapshot)
+
+    async def _beat(self, db: AsyncIOMotorDatabase):
+        while self._jobs:
+            now = datetime.utcnow()
+            for job in self._jobs.values():
+                job.heartbeat_at = now
+            try:
+                await db.jobs.update_many({"id": {"$in": list(self._jobs)}}, {"$set": {"heartbeat_at": now}})
+            except Exception:
+                logger.exception("Job heartbeat failed")
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+    @staticmethod
+    def is_orphaned(job: Job) -> bool:
+        """An unfinished job whose process stopped heartbeating it"""
+        return (
+            job.status not in FINISHED
+            and (job.heartbeat_at is None or job.heartbeat_at < datetime.utcnow() - HEARTBEAT_TIMEOUT)
+        )
+
+    async def mark_interrupted(self, db: AsyncIOMotorDatabase, job: Job) -> Job:
+        job.status = "interrupted"
+        job.finished_at = datetime.utcnow()
+        await db.jobs.update_one(
+            {"id": job.id, "status": {"$nin": list(FINISHED)}},
+            {"$set": {"status": job.status, "finished_at": job.finished_at}}
+        )
+        return job
+
+    async def recover(self, db: AsyncIOMotorDatabase) -> int:
+        """Mark unfinished jobs whose process stopped heartbeating them as interrupted"""
+        result = await db.jobs.update_many(
+            {
+                "status": {"$nin": list(FINISHED)},
+                "id": {"$nin": list(self._jobs)},
+                "$or": [
+                    {"heartbeat_at": None},
+                    {"heartbeat_at": {"$lt": datetime.utcnow() - HEARTBEAT_TIMEOUT}},
+                ],
+            },
+            {"$set": {"status": "interrupted", "finished_at": datetime.utcnow()}}
+        )
+        return result.modified_count
+
+    async def shutdown(self):
+        tasks = list(self._tasks.values())
+        if self._heartbeat is not None:
+            tasks.append(self._heartbeat)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "maxConcurrent": self.max_concurrent,
+            "active": len(self._tasks),
+            "submitted": self.submitted,
+        }
+
+job_runner = JobRunner(max_concurrent=int(os.environ.get("JOB_MAX_CONCURRENT", "2")))
@@ -0,0 +1,190 @@
+import asyncio
+import hashlib
+import io
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from services.singleflight import SingleFlight
+
+# Bounding boxes (width, height) of the thumbnail sizes; player photos are 2:3 portraits
+THUMBNAIL_SIZES: Dict[str, Tuple[int, int]] = {"sm": (64, 96), "md": (200, 300)}
+JPEG_QUALITY = 82
+
+class PhotoSource(ABC):
+    """Where original player photos come from"""
+
+    @abstractmethod
+    def version(self, player_id: str) -> Optional[str]:
+        """A cheap fingerprint that changes whenever the photo does; None if there is no photo"""
+
+    @abstractmethod
+    def read(self, player_id: str) -> Optional[bytes]:
+        ...
+
+class LocalDirectorySource(PhotoSource):
+    """Photos stored as <player id>.<ext> in a directory"""
+
+    EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _path(self, player_id: str) -> Optional[Path]:
+        # Ids are uuids; refuse anything that could escape the directory
+        if not player_id or "/" in player_id or "\\" in player_id or player_id.startswith("."):
+            return None
+        for ext in self.EXTENSIONS:
+            path = self.root / f"{player_id}{ext}"
+            if path.is_file():
+                return path
+        return None
+
+    def version(self, player_id: str) -> Optional[str]:
+        path = self._path(player_id)
+        if path is None:
+            return None
+        stat = path.stat()
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    def read(self, player_id: str) -> Optional[bytes]:
+        path = self._path(player_id)
+        return path.read_bytes() if path else None
+
+class ThumbnailCache:
+    """
+    Size-bounded LRU cache of thumbnail files on disk. Called from worker threads, so
+    the bookkeeping is under a lock; file reads and writes happen outside it.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Pick up thumbnails from a previous run, least recently used first
+        existing = sorted(self.directory.glob("*.jpg"), key=lambda p: p.stat().st_mtime)
+        for path in existing:
+            size = path.stat().st_size
+            self._entries[path.stem] = size
+            self.total_bytes += size
+        self._evict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+        try:
+            data = (self.directory / f"{key}.jpg").read_bytes()
+        except FileNotFoundError:
+            # Evicted meanwhile, or removed behind our back
+            with self._lock:
+                self.total_bytes -= self._entries.pop(key, 0)
+                self.misses += 1
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes):
+        path = self.directory / f"{key}.jpg"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self.total_bytes += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._evict()
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                (self.directory / f"{key}.jpg").unlink()
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "maxBytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+def make_thumbnail(original: bytes, box: Tuple[int, int]) -> bytes:
+    """Resize to fit the box (keeping the aspect ratio) and encode as JPEG"""
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(original)) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(box)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        out = io.BytesIO()
+        image.save(out, "JPEG", quality=JPEG_QUALITY, optimize=True)
+        return out.getvalue()
+
+class PhotoService:
+    """
+    Thumbnails by ETag. Stat calls, cache file reads and writes and Pillow all run in
+    worker threads, so a slow disk or a large photo never stalls the event loop.
+    """
+
+    def __init__(self, source: PhotoSource, cache: ThumbnailCache):
+        self.source = source
+        self.cache = cache
+        self._flight = SingleFlight("photos")
+
+    async def etag(self, player_id: str, size: str) -> Optional[str]:
+        """ETag of a thumbnail, or None if the player has no photo"""
+        version = await asyncio.to_thread(self.source.version, player_id)
+        if version is None:
+            return None
+        return hashlib.sha1(f"{player_id}:{size}:{version}".encode()).hexdigest()[:20]
+
+    async def thumbnail(self, player_id: str, size: str, etag: str) -> Optional[bytes]:
+        """Thumbnail bytes from the cache, generating them (once per ETag) on a miss"""
+        cached = await asyncio.to_thread(self.cache.get, etag)
+        if cached is not None:
+            return cached
+        return await self._flight.do(etag, lambda: self._generate(player_id, size, etag))
+
+    async def _generate(self, player_id: str, size: str, etag: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._generate_sync, player_id, size, etag)
+
+    def _generate_sync(self, player_id: str, size: str, etag: str) -> Optional[bytes]:
+        original = self.source.read(player_id)
+        if original is None:
+            return None
+        data = make_thumbnail(original, THUMBNAIL_SIZES[size])
+        self.cache.put(etag, data)
+        return data
+
+_photo_service: Optional[PhotoService] = None
+
+def get_photo_service() -> PhotoService:
+    global _photo_service
+    if _photo_service is None:
+        root = Path(__file__).parent.parent
+        _photo_service = PhotoService(
+            LocalDirectorySource(Path(os.environ.get("PHOTO_DIR", root / "photos"))),
+            ThumbnailCache(
+                Path(os.environ.get("PHOTO_CACHE_DIR", root / ".photo_cache")),
+                int(os.environ.get("PHOTO_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+            )
+        )
+    return _photo_service
@@ -0,0 +1,146 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from models.player import (
+    SCHEMA_VERSION, Player, PlayerCreate, PlayerUpdate, derived_ratings, player_from_db
+)
+from services.events import roster_events
+
+class PlayerNotFound(Exception):
+    pass
+
+async def update_player(db: AsyncIOMotorDatabase, player_id: str, player_data: PlayerUpdate) -> Dict[str, Any]:
+    """
+    Apply a partial update and publish the changed fields; returns the changes.
+    Raises PlayerNotFound, or ValueError for a taken name or a points edit on a rated player.
+    """
+    existing = await db.players.find_one({"id": player_id})
+    if not existing:
+        raise PlayerNotFound("Player not found")
+    
+    # Prepare update data (only include non-None fields)
+    update_data = {k: v for k, v in player_data.dict().items() if v is not None}
+    update_data["updated_at"] = datetime.utcnow()
+    
+    # Rated players' points follow their match rating; a manual edit would be lost at the next match
+    if existing.get("rating") is not None and update_data.get("points", existing["points"]) != existing["points"]:
+        raise ValueError("Points of a rated player are set by match results and cannot be edited")
+    
+    # Check name uniqueness if name is being updated
+    if "name" in update_data:
+        name_exists = await db.players.find_one({
+            "name": update_data["name"],
+            "id": {"$ne": player_id}
+        })
+        if name_exists:
+            raise ValueError("Player name already exists")
+    
+    # Derived ratings follow the skills and position they come from
+    if "skills" in update_data or "position" in update_data:
+        update_data.update(derived_ratings(
+            update_data.get("skills", existing["skills"]), update_data.get("position", existing["position"])
+        ))
+    
+    await db.players.update_one(
+        {"id": player_id},
+        {"$set": update_data}
+    )
+    changes = {k: v for k, v in update_data.items() if existing.get(k) != v}
+    await roster_events.publish("update", player_id, changes)
+    return changes
+
+async def insert_players(
+    db: AsyncIOMotorDatabase,
+    players_data: List[PlayerCreate],
+    first_row: int = 1
+) -> Tuple[List[Player], List[str]]:
+    """
+    Insert a batch of new players with one name lookup and one insert_many.
+    Returns the created players and an error per skipped row (name taken or repeated in the batch).
+    """
+    players = [Player(**player_data.dict()) for player_data in players_data]
+    return await insert_new_players(db, players, range(first_row, first_row + len(players)))
+
+async def insert_new_players(
+    db: AsyncIOMotorDatabase,
+    players: List[Player],
+    rows: Sequence[int]
+) -> Tuple[List[Player], List[str]]:
+    """insert_players for already built players; rows are their row numbers for error messages"""
+    names = [p.name for p in players]
+    taken = {
+        p["name"] for p in await db.players.find({"name": {"$in": names}}, {"_id": 0, "name": 1}).to_list(None)
+    }
+    created, errors = [], []
+    for row, player in zip(rows, players):
+        if player.name in taken:
+            errors.append(f"Row {row}: Player '{player.name}' already exists")
+            continue
+        taken.add(player.name)
+        created.append(player)
+
+    if created:
+        await db.players.insert_many([p.dict() for p in created], ordered=False)
+        for player in created:
+            await roster_events.publish("create", player.id, player.dict())
+    return created, errors
+
+async def ranked_players(
+    db: AsyncIOMotorDatabase,
+    by: str,
+    position: Optional[str] = None,
+    minimum: Optional[float] = None,
+    limit: int = 20
+) -> List[Player]:
+    """Players by a derived rating, best first; served by the (position, rating, id) indexes"""
+    query: Dict[str, Any] = {}
+    if position:
+        query["position"] = position
+    if minimum is not None:
+        query[by] = {"$gte": minimum}
+    docs = await db.players.find(query, {"_id": 0}).sort([(by, -1), ("id", 1)]).limit(limit).to_list(limit)
+    return [player_from_db(doc) for doc in docs]
+
+async def backfill_derived_ratings(
+    db: AsyncIOMotorDatabase,
+    batch_size: int = 500,
+    dry_run: bool = False
+) -> Tuple[int, List[str]]:
+    """
+    Store the derived ratings of players written before the current schema, which
+    ranked_players would otherwise sort last. Only the derived ratings, schemaVersion
+    and updated_at are written, and only while the skills and position they were
+    computed from are unchanged, so concurrent edits are never overwritten.
+    Returns the number of players updated and an error per player that fails validation.
+    """
+    outdated = {"schemaVersion": {"$ne": SCHEMA_VERSION}}
+    updated, errors = 0, []
+    batch = []
+
+    async def flush():
+        if dry_run or not batch:
+            return len(batch)
+        result = await db.players.bulk_write(batch, ordered=False)
+        return result.modified_count
+
+    async for doc in db.players.find(outdated, {"_id": 0}, batch_size=batch_size):
+        try:
+            # Full validation checks the skills the ratings are computed from
+            player = Player(**doc)
+        except ValueError as e:
+            errors.append(f"Player {doc.get('id')}: {e}")
+            continue
+        batch.append(UpdateOne(
+            {**outdated, "id": player.id, "skills": doc["skills"], "position": doc["position"]},
+            {"$set": {
+                **derived_ratings(doc["skills"], doc["position"]),
+                "schemaVersion": SCHEMA_VERSION,
+                "updated_at": datetime.utcnow(),
+            }}
+        ))
+        if len(batch) >= batch_size:
+            updated += await flush()
+            batch = []
+    updated += await flush()
+    return updated, errors
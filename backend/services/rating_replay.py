@@ -0,0 +1,48 @@
+from typing import List, Dict, Any
+from services.rating_service import K_FACTOR, SCALE
+
+def replay_ratings(
+    seeds: Dict[str, float],
+    matches: List[Dict[str, Any]],
+    k_factor: float = K_FACTOR,
+    scale: float = SCALE
+) -> Dict[str, float]:
+    """
+    Replay every match, in the order they were recorded (created_at), from the seed
+    ratings and return the final ratings.
+    Lineups are packed into padded index matrices once, so each match is a handful of
+    array operations; players missing from `seeds` (deleted since) are skipped.
+    """
+    # Only the replay script needs numpy; keep it out of the server's imports
+    import numpy as np
+
+    player_ids = list(seeds)
+    index = {player_id: i for i, player_id in enumerate(player_ids)}
+    # Slot len(player_ids) is a scratch rating that absorbs padding
+    ratings = np.append(np.array([seeds[i] for i in player_ids], dtype=np.float64), 0.0)
+    pad = len(player_ids)
+
+    width = max((max(len(m["team1"]), len(m["team2"])) for m in matches), default=0)
+    lineups = np.full((len(matches), 2, width), pad, dtype=np.int64)
+    for row, m in enumerate(matches):
+        for side, team in enumerate((m["team1"], m["team2"])):
+            slots = [index[player_id] for player_id in team if player_id in index]
+            lineups[row, side, :len(slots)] = slots
+
+    sizes = (lineups != pad).sum(axis=2)
+    scores = np.array([(m["team1Score"], m["team2Score"]) for m in matches], dtype=np.float64).reshape(-1, 2)
+    outcome = np.sign(scores[:, 0] - scores[:, 1]) * 0.5 + 0.5
+    margin = 1.0 + np.log1p(np.abs(scores[:, 0] - scores[:, 1]))
+    playable = (sizes > 0).all(axis=1)
+
+    for row in np.flatnonzero(playable):
+        team1, team2 = lineups[row]
+        ratings[pad] = 0.0
+        r1 = ratings[team1].sum() / sizes[row, 0]
+        r2 = ratings[team2].sum() / sizes[row, 1]
+        expected = 1.0 / (1.0 + 10 ** ((r2 - r1) / scale))
+        delta = k_factor * margin[row] * (outcome[row] - expected)
+        ratings[team1] += delta
+        ratings[team2] -= delta
+
+    return {player_id: float(ratings[i]) for i, player_id in enumerate(player_ids)}
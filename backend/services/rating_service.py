@@ -0,0 +1,152 @@
+import asyncio
+import math
+import uuid
+
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Tuple
+from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from models.match import Match, MatchCreate
+from services.events import roster_events
+
+# Elo-style team rating on the 1-99 points scale:
+# a team SCALE points stronger on average is expected to win 10:1,
+# and a one-goal result moves every player by at most K_FACTOR points.
+K_FACTOR = 2.0
+SCALE = 20.0
+
+def expected_score(team_rating: float, opponent_rating: float, scale: float = SCALE) -> float:
+    """Probability-like expected result for a team, 0..1"""
+    return 1.0 / (1.0 + 10 ** ((opponent_rating - team_rating) / scale))
+
+def team_delta(
+    team1_rating: float,
+    team2_rating: float,
+    team1_score: int,
+    team2_score: int,
+    k_factor: float = K_FACTOR,
+    scale: float = SCALE
+) -> float:
+    """Rating change for every team1 player (team2 players get the negation)"""
+    if team1_score > team2_score:
+        outcome = 1.0
+    elif team1_score < team2_score:
+        outcome = 0.0
+    else:
+        outcome = 0.5
+    # Bigger wins count for more, with diminishing returns
+    margin = 1.0 + math.log1p(abs(team1_score - team2_score))
+    return k_factor * margin * (outcome - expected_score(team1_rating, team2_rating, scale))
+
+def points_for_rating(rating: float) -> int:
+    """Integer points used by the shuffle for a rating"""
+    return min(99, max(1, round(rating)))
+
+def current_rating(player: Dict[str, Any]) -> float:
+    return player["rating"] if player.get("rating") is not None else float(player["points"])
+
+def rating_updates(
+    team1: List[Dict[str, Any]],
+    team2: List[Dict[str, Any]],
+    team1_score: int,
+    team2_score: int
+) -> Tuple[Dict[str, float], List[UpdateOne]]:
+    """
+    Per-player rating deltas and the matching player writes.
+    The writes add the delta to the stored rating inside the update itself, so a
+    concurrent match on the same players can't overwrite it; points and the seed
+    rating are derived from the stored values in the same update.
+    """
+    team1_rating = sum(current_rating(p) for p in team1) / len(team1)
+    team2_rating = sum(current_rating(p) for p in team2) / len(team2)
+    delta = team_delta(team1_rating, team2_rating, team1_score, team2_score)
+
+    now = datetime.utcnow()
+    changes = {}
+    updates = []
+    for players, player_delta in ((team1, delta), (team2, -delta)):
+        for p in players:
+            changes[p["id"]] = player_delta
+            updates.append(UpdateOne({"id": p["id"]}, [
+                {"$set": {
+                    "seedRating": {"$ifNull": ["$seedRating", {"$ifNull": ["$rating", "$points"]}]},
+                    "rating": {"$add": [{"$ifNull": ["$rating", "$points"]}, player_delta]},
+                    "updated_at": now,
+                }},
+                {"$set": {"points": {"$toInt": {"$min": [99, {"$max": [1, {"$round": ["$rating", 0]}]}]}}}},
+            ]))
+    return changes, updates
+
+# Matches are applied one at a time, in created_at order, so a replay sorted on
+# created_at sees exactly the ratings each live update saw. The asyncio lock queues
+# requests within a worker; the lease in db.locks serializes workers and the
+# recompute script. A holder that dies lets the lease lapse after MATCH_LEASE.
+_match_lock = asyncio.Lock()
+MATCH_LEASE = timedelta(seconds=30)
+LEASE_POLL_SECONDS = 0.05
+
+@asynccontextmanager
+async def match_lease(db: AsyncIOMotorDatabase):
+    """Hold the database-wide lease on rating writes"""
+    owner = uuid.uuid4().hex
+    while True:
+        now = datetime.utcnow()
+        try:
+            # Matches a missing or lapsed lease; a live one makes the upsert collide on _id
+            await db.locks.update_one(
+                {"_id": "matches", "expires_at": {"$lt": now}},
+                {"$set": {"owner": owner, "expires_at": now + MATCH_LEASE}},
+                upsert=True
+            )
+            break
+        except DuplicateKeyError:
+            await asyncio.sleep(LEASE_POLL_SECONDS)
+    try:
+        yield
+    finally:
+        await db.locks.delete_one({"_id": "matches", "owner": owner})
+
+async def record_match(db: AsyncIOMotorDatabase, match_data: MatchCreate) -> Match:
+    """
+    Store a match result and apply its rating changes in one batched write.
+    Raises ValueError if a team lists a player twice, the teams overlap,
+    or they refer to unknown players.
+    """
+    for team in (match_data.team1, match_data.team2):
+        if len(set(team)) != len(team):
+            raise ValueError("A player is listed twice in the same team")
+    if set(match_data.team1) & set(match_data.team2):
+        raise ValueError("A player cannot be on both teams")
+
+    player_ids = match_data.team1 + match_data.team2
+    async with _match_lock, match_lease(db):
+        players_data = await db.players.find(
+            {"id": {"$in": player_ids}},
+            {"_id": 0, "id": 1, "points": 1, "rating": 1, "seedRating": 1}
+        ).to_list(len(player_ids))
+        players = {p["id"]: p for p in players_data}
+
+        missing_ids = set(player_ids) - set(players)
+        if missing_ids:
+            raise ValueError(f"Some players not found. Missing IDs: {list(missing_ids)}")
+
+        changes, updates = rating_updates(
+            [players[i] for i in match_data.team1],
+            [players[i] for i in match_data.team2],
+            match_data.team1Score,
+            match_data.team2Score
+        )
+        match = Match(
+            **match_data.dict(),
+            ratingChanges={player_id: round(delta, 3) for player_id, delta in changes.items()}
+        )
+        await db.matches.insert_one(match.dict())
+        await db.players.bulk_write(updates, ordered=False)
+
+        # Same values the update pipelines computed, for caches and live clients
+        for player_id, delta in changes.items():
+            rating = current_rating(players[player_id]) + delta
+            await roster_events.publish("update", player_id, {"rating": rating, "points": points_for_rating(rating)})
+    return match
@@ -0,0 +1,177 @@
+import heapq
+from itertools import islice
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Set
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from services.cache import cache, GenerationTracker, ROSTER
+from services.events import roster_events
+from services.singleflight import index_flight
+
+# What a search result carries: enough to pick a player, not the whole document
+SEARCH_FIELDS = ("id", "name", "position", "points", "photo", "nationality", "isSubscribed")
+MAX_RESULTS = 50
+
+def normalize(text: str) -> str:
+    """Lowercase and strip accents, so "jose" finds "José" """
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+def _tokens(text: str) -> List[str]:
+    return normalize(text).replace("-", " ").replace("'", " ").split()
+
+def _trigrams(token: str) -> Set[str]:
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+class PlayerSearchIndex:
+    """
+    In-memory typeahead index over player names and nationalities.
+    Every word is indexed under all of its prefixes (a flattened trie) and its
+    trigrams, so matching is a few dict lookups and set intersections per term,
+    and ranking only orders the matched ids by a precomputed key.
+    The index is loaded once at startup and kept current from roster events.
+    """
+
+    def __init__(self):
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._sort_keys: Dict[str, tuple] = {}
+        self._order: Optional[List[str]] = None  # all ids by sort key, rebuilt lazily after writes
+        self._tables: Dict[str, Dict[str, Set[str]]] = {
+            "name": {},         # prefixes of the whole name
+            "name_word": {},    # prefixes of each name word
+            "nation_word": {},  # prefixes of each nationality word
+            "trigram": {},      # trigrams of every word, for matches inside a word
+        }
+        self._keys: Dict[str, List[tuple]] = {}  # (table, key) per player, for removal
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def load(self, players: Iterable[Dict[str, Any]]):
+        self._docs.clear()
+        self._sort_keys.clear()
+        self._order = None
+        self._keys.clear()
+        for table in self._tables.values():
+            table.clear()
+        for player in players:
+            self.upsert(player)
+
+    def _add(self, table: str, key: str, player_id: str, keys: List[tuple]):
+        self._tables[table].setdefault(key, set()).add(player_id)
+        keys.append((table, key))
+
+    def upsert(self, player: Dict[str, Any]):
+        """Add a player, or merge changed fields into an indexed one"""
+        player_id = player["id"]
+        doc = dict(self._docs.get(player_id, {}))
+        doc.update({k: player[k] for k in SEARCH_FIELDS if k in player})
+        if "name" not in doc:
+            return  # a partial update for a player we never saw
+        self.remove(player_id)
+        self._docs[player_id] = doc
+        self._order = None
+
+        name = " ".join(_tokens(doc["name"]))
+        self._sort_keys[player_id] = (len(name), name)
+        keys: List[tuple] = []
+        for end in range(1, len(name) + 1):
+            self._add("name", name[:end], player_id, keys)
+        for table, text in (("name_word", doc["name"]), ("nation_word", doc.get("nationality", ""))):
+            for token in set(_tokens(text)):
+                for end in range(1, len(token) + 1):
+                    self._add(table, token[:end], player_id, keys)
+                for gram in _trigrams(token):
+                    self._add("trigram", gram, player_id, keys)
+        self._keys[player_id] = keys
+
+    def remove(self, player_id: str):
+        self._docs.pop(player_id, None)
+        self._sort_keys.pop(player_id, None)
+        self._order = None
+        for table, key in self._keys.pop(player_id, ()):
+            ids = self._tables[table].get(key)
+            if ids is not None:
+                ids.discard(player_id)
+                if not ids:
+                    del self._tables[table][key]
+
+    def _matches(self, term: str) -> Set[str]:
+        """Players with a word starting with, or (for 3+ characters) containing, term"""
+        found = self._tables["name_word"].get(term, set()) | self._tables["nation_word"].get(term, set())
+        if len(term) >= 3:
+            trigrams = self._tables["trigram"]
+            grams = sorted(_trigrams(term), key=lambda g: len(trigrams.get(g, ())))
+            candidates = set(trigrams.get(grams[0], ()))
+            for gram in grams[1:]:
+                candidates &= trigrams.get(gram, set())
+            # Trigrams can match out of order; confirm the substring
+            for player_id in candidates - found:
+                doc = self._docs[player_id]
+                if term in normalize(doc["name"]) or term in normalize(doc.get("nationality", "")):
+                    found.add(player_id)
+        return found
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Players matching every word of query. Whole-name prefix matches come first,
+        then players whose name words start with every term, then the rest;
+        shorter names first within each tier.
+        """
+        terms = _tokens(query)
+        if not terms:
+            return []
+        matched = None
+        for term in sorted(set(terms), key=len, reverse=True):
+            ids = self._matches(term)
+            matched = ids if matched is None else matched & ids
+            if not matched:
+                return []
+
+        name_prefix = matched & self._tables["name"].get(" ".join(terms), set())
+        word_prefix = set(matched)
+        for term in terms:
+            word_prefix &= self._tables["name_word"].get(term, set())
+        tiers = (name_prefix, word_prefix - name_prefix, matched - word_prefix - name_prefix)
+
+        results: List[Dict[str, Any]] = []
+        for tier in tiers:
+            if len(results) >= limit:
+                break
+            results.extend(self._docs[player_id] for player_id in self._first(tier, limit - len(results)))
+        return results
+
+    def _first(self, ids: Set[str], n: int) -> List[str]:
+        """The n ids that sort first; broad matches walk the presorted order instead of ranking every hit"""
+        if len(ids) * 8 < len(self._docs):
+            return heapq.nsmallest(n, ids, key=self._sort_keys.__getitem__)
+        if self._order is None:
+            self._order = sorted(self._sort_keys, key=self._sort_keys.__getitem__)
+        return list(islice((player_id for player_id in self._order if player_id in ids), n))
+
+    def on_roster_event(self, event: Dict[str, Any]):
+        if event["type"] == "delete":
+            self.remove(event["id"])
+        elif set(SEARCH_FIELDS) & set(event.get("fields") or ()):
+            self.upsert({**event["fields"], "id": event["id"]})
+
+player_search = PlayerSearchIndex()
+_sync = GenerationTracker(cache, ROSTER)
+
+def _on_roster_event(event: Dict[str, Any]):
+    _sync.local_change()
+    player_search.on_roster_event(event)
+
+roster_events.add_listener(_on_roster_event)
+
+async def load_search_index(db: AsyncIOMotorDatabase):
+    generation = await _sync.begin_load()
+    projection = {"_id": 0, **{field: 1 for field in SEARCH_FIELDS}}
+    player_search.load(await db.players.find({}, projection).to_list(None))
+    _sync.loaded(generation)
+
+async def fresh_search_index(db: AsyncIOMotorDatabase) -> PlayerSearchIndex:
+    """The index, reloaded first if players changed in another worker since it was loaded"""
+    if await _sync.is_stale():
+        await index_flight.do("search", lambda: load_search_index(db))
+    return player_search
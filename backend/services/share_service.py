@@ -0,0 +1,141 @@
+import hashlib
+import json
+import random
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from models.player import player_from_db
+from models.shuffle import GameDetails, ShareCreate
+from services.cache import cache
+from services.shuffle_service import shuffle_teams
+
+BASE62 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+
+class ShareNotFound(Exception):
+    pass
+
+# Rendered share text. Shares render from the lineup saved with them, so entries
+# never go stale and only the LRU bound evicts them
+LINEUPS = "lineups"
+
+def upcoming_sunday(today: Optional[date] = None) -> str:
+    """E.g. "24th August, 2025"; always the next Sunday, a week ahead on Sundays"""
+    today = today or date.today()
+    days = (6 - today.weekday()) % 7 or 7
+    sunday = today + timedelta(days=days)
+    n = sunday.day
+    if 3 < n < 21:
+        suffix = "th"
+    else:
+        suffix = {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix} {sunday.strftime('%B')}, {sunday.year}"
+
+def _num(n: int) -> str:
+    # The zero-width space stops WhatsApp from continuing numbered lists across sections
+    return f"{n}.​"
+
+def render_share_text(team1: List[str], team2: List[str], details: GameDetails) -> str:
+    """Same message the frontend builds in generateWhatsAppMessage"""
+    msg = "*⚠ SUNDAY MORNING ⚠*\n"
+    msg += f"*{details.date or upcoming_sunday()}*\n"
+    msg += f"*👉 Time:- {details.time or '7:00 - 8:30 AM'}*\n"
+    msg += f"*👉 Venue:- {details.venue or 'Savvy Swaraj'}*\n"
+    msg += f"*{details.price or '220₹pp'}*\n\n"
+
+    for title, names in (("Team A: Black/Dark", team1), ("Team B: White/Light", team2)):
+        msg += f"*{title}*\n\n"
+        for i, name in enumerate(names):
+            msg += f"{_num(i + 1)} {name}\n"
+        msg += "Waiting:\n"
+        msg += f"{_num(9)} TBD\n\n"
+
+    return msg + "🔥🔥Game On🔥🔥"
+
+def share_code(teams: Dict[str, Any], details: GameDetails) -> str:
+    """Short code derived from the lineup and details, so identical shares reuse one link"""
+    digest = hashlib.sha256(json.dumps([teams, details.dict()], sort_keys=True).encode()).digest()
+    number = int.from_bytes(digest[:8], "big")
+    code = ""
+    for _ in range(8):
+        number, digit = divmod(number, 62)
+        code += BASE62[digit]
+    return code
+
+def _team(players: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    return [{"id": p["id"], "name": p["name"]} for p in players]
+
+async def _lineup(db: AsyncIOMotorDatabase, source: Dict[str, Any]) -> Dict[str, List[Dict[str, str]]]:
+    """The teams of a share source as they are now, as id and name per player"""
+    if "shuffleId" in source:
+        record = await db.shuffles.find_one({"id": source["shuffleId"]}, {"_id": 0, "team1": 1, "team2": 1})
+        if not record:
+            raise ShareNotFound("Shuffle not found")
+        team1_ids, team2_ids = record["team1"]["playerIds"], record["team2"]["playerIds"]
+        players = await db.players.find(
+            {"id": {"$in": team1_ids + team2_ids}}, {"_id": 0, "id": 1, "name": 1}
+        ).to_list(len(team1_ids) + len(team2_ids))
+        names = {p["id"]: p["name"] for p in players}
+        return {
+            team: [{"id": i, "name": names.get(i, "(removed player)")} for i in ids]
+            for team, ids in (("team1", team1_ids), ("team2", team2_ids))
+        }
+
+    player_ids = source["playerIds"]
+    players_data = await db.players.find({"id": {"$in": player_ids}}).to_list(len(player_ids))
+    if len(players_data) != len(player_ids):
+        raise ShareNotFound("Some players of this shuffle no longer exist")
+    result = shuffle_teams([player_from_db(p) for p in players_data], random.Random(source["seed"]))
+    return {"team1": _team(result["team1"]["players"]), "team2": _team(result["team2"]["players"])}
+
+def _render(teams: Dict[str, List[Dict[str, str]]], details: GameDetails) -> str:
+    return render_share_text(
+        [p["name"] for p in teams["team1"]], [p["name"] for p in teams["team2"]], details
+    )
+
+async def create_share(db: AsyncIOMotorDatabase, share: ShareCreate) -> Dict[str, str]:
+    """
+    Store a share of a confirmed or seeded shuffle, with its lineup as it is now, and
+    render it. Later rating changes or renames don't alter what the link shows.
+    Raises ValueError for an invalid source and ShareNotFound if it doesn't exist.
+    """
+    if share.shuffleId and share.playerIds is None:
+        source = {"shuffleId": share.shuffleId}
+    elif share.playerIds is not None and share.seed is not None and not share.shuffleId:
+        source = {"playerIds": sorted(set(share.playerIds)), "seed": share.seed}
+        if len(source["playerIds"]) != len(share.playerIds):
+            raise ValueError("A player is listed twice")
+    else:
+        raise ValueError("Provide either shuffleId, or playerIds with a seed")
+
+    # Pin the default date now, so the link keeps showing the game it was shared for
+    details = share.details.copy(update={"date": share.details.date or upcoming_sunday()})
+    teams = await _lineup(db, source)
+    code = share_code(teams, details)
+    text = _render(teams, details)
+    await db.shares.update_one(
+        {"code": code},
+        {"$setOnInsert": {
+            "code": code, "source": source, "teams": teams, "details": details.dict(), "created_at": datetime.utcnow()
+        }},
+        upsert=True
+    )
+    await cache.set(LINEUPS, code, text, await cache.generation(LINEUPS))
+    return {"code": code, "text": text}
+
+async def share_text(db: AsyncIOMotorDatabase, code: str) -> str:
+    """Rendered text of a share; repeat opens are served from the cache. Raises ShareNotFound"""
+    text = await cache.get(LINEUPS, code)
+    if text is not None:
+        return text
+    doc = await db.shares.find_one({"code": code}, {"_id": 0})
+    if not doc:
+        raise ShareNotFound("Share not found")
+    teams = doc.get("teams")
+    if teams is None:
+        # Shares stored before lineups were saved with them: freeze the lineup now
+        teams = await _lineup(db, doc["source"])
+        await db.shares.update_one({"code": code, "teams": None}, {"$set": {"teams": teams}})
+    text = _render(teams, GameDetails(**doc["details"]))
+    await cache.set(LINEUPS, code, text, await cache.generation(LINEUPS))
+    return text
@@ -1,22 +1,69 @@
 import random
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from typing import List, Dict, Any
+from datetime import datetime
+from typing import List, Dict, Any, Optional
 from models.player import Player
 
-def shuffle_teams(players: List[Player]) -> Dict[str, Any]:
+SQUAD_SIZE = 16
+
+# Minimum number of players per position on each team
+TEAM_POSITION_MINIMUMS = {"DEF": 2, "ATT": 2, "MID": 1}
+
+# Minimum number of players per position the shuffle needs across both teams
+POSITION_MINIMUMS = {position: 2 * count for position, count in TEAM_POSITION_MINIMUMS.items()}
+
+# Fields needed to pick the squad; the full documents are only loaded for the chosen players
+POOL_PROJECTION = {"_id": 0, "id": 1, "position": 1, "gamesPlayed": 1, "lastPlayedAt": 1}
+
+def select_pool(candidates: List[Dict[str, Any]], size: int = SQUAD_SIZE) -> List[str]:
+    """
+    Pick the ids of `size` players from the available candidates.
+    Players with the fewest games (then the longest since their last game) go first,
+    ties are broken randomly. Position minimums are filled before the open slots.
+    """
+    if len(candidates) < size:
+        raise ValueError(f"At least {size} available players are required. Found {len(candidates)} players.")
+
+    def priority(candidate: Dict[str, Any]):
+        return (
+            candidate.get("gamesPlayed") or 0,
+            candidate.get("lastPlayedAt") or datetime.min,
+            random.random(),
+        )
+
+    ranked = sorted(candidates, key=priority)
+
+    selected = []
+    for position, minimum in POSITION_MINIMUMS.items():
+        in_position = [c for c in ranked if c.get("position") == position]
+        if len(in_position) < minimum:
+            raise ValueError(f"At least {minimum} available {position} players are required")
+        selected.extend(in_position[:minimum])
+
+    chosen_ids = {c["id"] for c in selected}
+    for candidate in ranked:
+        if len(selected) >= size:
+            break
+        if candidate["id"] not in chosen_ids:
+            selected.append(candidate)
+            chosen_ids.add(candidate["id"])
+
+    return [c["id"] for c in selected]
+
+def shuffle_teams(players: List[Player], rng: Optional[random.Random] = None) -> Dict[str, Any]:
     """
     Shuffle players into two balanced teams with position constraints:
     - Each team must have exactly 2 defenders, 2 attackers, 1 midfielder
     - Remaining 3 players can be any position
     - Teams should be balanced by total points
+    Pass a seeded `rng` for a reproducible shuffle of the same players.
     """
+    rng = rng or random.Random()
     if len(players) != 16:
         raise ValueError("Exactly 16 players are required for team shuffle")
     
-    # Separate players by position
+    # Separate players by position (in a fixed order, so a seeded rng gives a fixed result)
+    players = sorted(players, key=lambda p: p.id)
     defenders = [p for p in players if p.position == 'DEF']
     attackers = [p for p in players if p.position == 'ATT']
     midfielders = [p for p in players if p.position == 'MID']
@@ -30,9 +77,9 @@ def shuffle_teams(players: List[Player]) -> Dict[str, Any]:
         raise ValueError("At least 2 midfielders are required")
     
     # Shuffle each position array
-    random.shuffle(defenders)
-    random.shuffle(attackers) 
-    random.shuffle(midfielders)
+    rng.shuffle(defenders)
+    rng.shuffle(attackers) 
+    rng.shuffle(midfielders)
     
     # Assign mandatory positions to teams
     team1 = [
@@ -54,7 +101,7 @@ def shuffle_teams(players: List[Player]) -> Dict[str, Any]:
     remaining.extend(midfielders[2:])
     
     # Shuffle remaining players
-    random.shuffle(remaining)
+    rng.shuffle(remaining)
     
     # Balance teams by total points using remaining players
     team1_points = sum(p.points for p in team1)
@@ -73,15 +120,19 @@ def shuffle_teams(players: List[Player]) -> Dict[str, Any]:
             team2.append(player)
             team2_points += player.points
     
+    return build_result(team1, team2)
+
+def build_result(team1: List[Player], team2: List[Player]) -> Dict[str, Any]:
+    """Build the shuffle response for two teams"""
     return {
         "team1": {
             "players": [player.dict() for player in team1],
-            "totalPoints": team1_points,
+            "totalPoints": sum(p.points for p in team1),
             "formation": get_formation(team1)
         },
         "team2": {
             "players": [player.dict() for player in team2],
-            "totalPoints": team2_points,
+            "totalPoints": sum(p.points for p in team2),
             "formation": get_formation(team2)
         }
     }
@@ -0,0 +1,168 @@
+from typing import Any, Dict, Iterable, List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from services.cache import cache, GenerationTracker, ROSTER
+from services.events import roster_events
+from services.singleflight import index_flight
+
+POSITIONS = ("DEF", "MID", "ATT")
+SKILLS = ("pace", "shooting", "passing", "defending", "dribbling", "physical")
+# A different position costs about as much as a 70 point gap in a single attribute
+POSITION_WEIGHT = 0.5
+# What a similar-player result carries besides the distance
+RESULT_FIELDS = ("id", "name", "position", "points", "photo", "nationality", "isSubscribed", "skills")
+MAX_K = 50
+
+class PlayerSimilarityIndex:
+    """
+    Player profiles as rows of a normalized matrix: position one-hot, then points and
+    the six skills scaled to 0-1. A lookup is one vectorized distance computation
+    over the matrix plus a partial sort. Rows are added, overwritten and swap-removed
+    from roster events, so the matrix is never rebuilt per query.
+    NumPy is imported on first use, keeping it off the startup path.
+    """
+
+    def __init__(self):
+        self._np = None
+        self._ids: List[str] = []
+        self._row: Dict[str, int] = {}
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._matrix = None       # (capacity, dims) float32, first len(_ids) rows live
+        self._positions = None    # position index per row
+        self._subscribed = None   # isSubscribed per row
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _numpy(self):
+        if self._np is None:
+            import numpy as np
+            self._np = np
+            dims = len(POSITIONS) + 1 + len(SKILLS)
+            self._matrix = np.zeros((64, dims), dtype=np.float32)
+            self._positions = np.zeros(64, dtype=np.int8)
+            self._subscribed = np.zeros(64, dtype=bool)
+        return self._np
+
+    def _vector(self, doc: Dict[str, Any]):
+        np = self._numpy()
+        vector = np.zeros(self._matrix.shape[1], dtype=np.float32)
+        vector[POSITIONS.index(doc["position"])] = POSITION_WEIGHT
+        vector[len(POSITIONS)] = doc["points"] / 99
+        for i, skill in enumerate(SKILLS):
+            vector[len(POSITIONS) + 1 + i] = doc["skills"][skill] / 99
+        return vector
+
+    def _grow(self):
+        np = self._np
+        capacity = 2 * len(self._matrix)
+        self._matrix = np.resize(self._matrix, (capacity, self._matrix.shape[1]))
+        self._positions = np.resize(self._positions, capacity)
+        self._subscribed = np.resize(self._subscribed, capacity)
+
+    def load(self, players: Iterable[Dict[str, Any]]):
+        self._numpy()
+        self._ids.clear()
+        self._row.clear()
+        self._docs.clear()
+        for player in players:
+            self.upsert(player)
+
+    def upsert(self, player: Dict[str, Any]):
+        """Add a player, or merge changed fields into an indexed one and rewrite its row"""
+        self._numpy()
+        player_id = player["id"]
+        doc = dict(self._docs.get(player_id, {}))
+        doc.update({k: player[k] for k in RESULT_FIELDS if k in player})
+        if not all(k in doc for k in ("position", "points", "skills")):
+            return  # a partial update for a player we never saw
+        self._docs[player_id] = doc
+
+        row = self._row.get(player_id)
+        if row is None:
+            row = len(self._ids)
+            if row == len(self._matrix):
+                self._grow()
+            self._ids.append(player_id)
+            self._row[player_id] = row
+        self._matrix[row] = self._vector(doc)
+        self._positions[row] = POSITIONS.index(doc["position"])
+        self._subscribed[row] = bool(doc.get("isSubscribed", False))
+
+    def remove(self, player_id: str):
+        """Move the last row into the removed player's slot"""
+        row = self._row.pop(player_id, None)
+        if row is None:
+            return
+        self._docs.pop(player_id)
+        last = len(self._ids) - 1
+        if row != last:
+            moved = self._ids[last]
+            self._ids[row] = moved
+            self._row[moved] = row
+            self._matrix[row] = self._matrix[last]
+            self._positions[row] = self._positions[last]
+            self._subscribed[row] = self._subscribed[last]
+        self._ids.pop()
+
+    def similar(
+        self,
+        player_id: str,
+        k: int = 5,
+        same_position: bool = False,
+        subscribed_only: bool = False
+    ) -> Optional[List[Dict[str, Any]]]:
+        """The k nearest players to player_id, closest first; None if the player is unknown"""
+        row = self._row.get(player_id)
+        if row is None:
+            return None
+        np = self._np
+        n = len(self._ids)
+        matrix = self._matrix[:n]
+        distances = np.sqrt(((matrix - matrix[row]) ** 2).sum(axis=1))
+
+        excluded = np.zeros(n, dtype=bool)
+        excluded[row] = True
+        if same_position:
+            excluded |= self._positions[:n] != self._positions[row]
+        if subscribed_only:
+            excluded |= ~self._subscribed[:n]
+        distances[excluded] = np.inf
+
+        candidates = n - int(excluded.sum())
+        k = min(k, candidates)
+        if k <= 0:
+            return []
+        nearest = np.argpartition(distances, k - 1)[:k]
+        nearest = nearest[np.argsort(distances[nearest], kind="stable")]
+        return [
+            {**self._docs[self._ids[i]], "distance": round(float(distances[i]), 4)}
+            for i in nearest
+        ]
+
+    def on_roster_event(self, event: Dict[str, Any]):
+        if event["type"] == "delete":
+            self.remove(event["id"])
+        elif set(RESULT_FIELDS) & set(event.get("fields") or ()):
+            self.upsert({**event["fields"], "id": event["id"]})
+
+player_similarity = PlayerSimilarityIndex()
+_sync = GenerationTracker(cache, ROSTER)
+
+def _on_roster_event(event: Dict[str, Any]):
+    _sync.local_change()
+    player_similarity.on_roster_event(event)
+
+roster_events.add_listener(_on_roster_event)
+
+async def load_similarity_index(db: AsyncIOMotorDatabase):
+    generation = await _sync.begin_load()
+    projection = {"_id": 0, **{field: 1 for field in RESULT_FIELDS}}
+    player_similarity.load(await db.players.find({}, projection).to_list(None))
+    _sync.loaded(generation)
+
+async def fresh_similarity_index(db: AsyncIOMotorDatabase) -> PlayerSimilarityIndex:
+    """The index, reloaded first if players changed in another worker since it was loaded"""
+    if await _sync.is_stale():
+        await index_flight.do("similarity", lambda: load_similarity_index(db))
+    return player_similarity
@@ -0,0 +1,55 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: while a call for a key is in flight,
+    later callers with the same key wait for it and share its result (or exception).
+    Nothing is cached once the call completes.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.shared = 0
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            # The shared call runs in its own task, so a cancelled caller
+            # (e.g. a client that disconnected) doesn't cancel the others
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Retrieve the exception in case every caller was cancelled before it was raised
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "shared": self.shared,
+            "inflight": len(self._inflight),
+            "hitRate": round(self.shared / self.calls, 4) if self.calls else 0.0,
+        }
+
+# One group per coalesced endpoint
+roster_flight = SingleFlight("players")
+shuffle_flight = SingleFlight("shuffle_custom")
+stats_flight = SingleFlight("player_stats")
+bootstrap_flight = SingleFlight("bootstrap")
+index_flight = SingleFlight("player_indexes")
+
+def coalescing_stats() -> Dict[str, Any]:
+    return {
+        group.name: group.stats() for group in (roster_flight, shuffle_flight, stats_flight, bootstrap_flight, index_flight)
+    }
@@ -0,0 +1,123 @@
+import gzip
+import hashlib
+import struct
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+import bson
+
+# Snapshot layout, inside one gzip stream:
+#   MAGIC, then per collection a "C" frame, one "D" frame per document and an "E" frame.
+# A frame is a one-byte tag followed by a BSON document, which starts with its own
+# little-endian int32 length, so documents are copied as raw bytes both ways.
+# "C" is {"collection": name}; "E" is {"collection", "count", "sha256"} where the
+# digest covers the raw bytes of every document of the collection in order.
+MAGIC = b"FOOTBALLY-SNAPSHOT\x01\n"
+START, DOCUMENT, END = b"C", b"D", b"E"
+_LENGTH = struct.Struct("<i")
+# Decompressed bytes handled per read/write call; frames are small, so going through
+# the gzip stream one frame at a time would dominate the cost
+CHUNK_BYTES = 1 << 20
+
+class SnapshotError(Exception):
+    """The file is not a snapshot, is truncated, or fails its checksums"""
+
+class SnapshotWriter:
+    def __init__(self, fileobj: BinaryIO, compresslevel: int = 1):
+        # Level 1: most of the size win of gzip at a fraction of the time
+        self._out = gzip.GzipFile(fileobj=fileobj, mode="wb", compresslevel=compresslevel)
+        self._out.write(MAGIC)
+        self._buffer = bytearray()
+        self._collection: Optional[str] = None
+
+    def begin(self, collection: str):
+        self._collection, self._count, self._digest = collection, 0, hashlib.sha256()
+        self._buffer += START + bson.encode({"collection": collection})
+
+    def write(self, raw: bytes):
+        """Append one document, as the raw BSON bytes read from the database"""
+        self._buffer += DOCUMENT
+        self._buffer += raw
+        self._digest.update(raw)
+        self._count += 1
+        if len(self._buffer) >= CHUNK_BYTES:
+            self._flush()
+
+    def _flush(self):
+        self._out.write(self._buffer)
+        self._buffer.clear()
+
+    def end(self) -> int:
+        self._buffer += (END + bson.encode({
+            "collection": self._collection, "count": self._count, "sha256": self._digest.hexdigest()
+        }))
+        self._flush()
+        self._collection = None
+        return self._count
+
+    def close(self):
+        if self._collection is not None:
+            raise SnapshotError(f"Collection {self._collection} was not ended")
+        self._out.close()
+
+def _frames(stream: BinaryIO) -> Iterator[Tuple[bytes, bytes]]:
+    buffer, offset = b"", 0
+    while True:
+        if len(buffer) - offset < 5:
+            chunk = stream.read(CHUNK_BYTES)
+            buffer = buffer[offset:] + chunk
+            offset = 0
+            if not chunk:
+                if buffer:
+                    raise SnapshotError("Snapshot is truncated")
+                return
+            continue
+        length = _LENGTH.unpack_from(buffer, offset + 1)[0]
+        if length < 5:
+            raise SnapshotError("Snapshot is corrupt: bad frame length")
+        end = offset + 1 + length
+        if end > len(buffer):
+            chunk = stream.read(max(CHUNK_BYTES, end - len(buffer)))
+            if not chunk:
+                raise SnapshotError("Snapshot is truncated")
+            buffer = buffer[offset:] + chunk
+            offset = 0
+            continue
+        yield buffer[offset:offset + 1], buffer[offset + 1:end]
+        offset = end
+
+def read_snapshot(fileobj: BinaryIO) -> Iterator[Tuple[str, Optional[bytes]]]:
+    """
+    Yield (collection, raw BSON document) for every document, then (collection, None)
+    once the collection's count and checksum have been verified. Raises SnapshotError
+    as soon as a check fails, so a restore stops at the first bad collection.
+    """
+    try:
+        stream = gzip.GzipFile(fileobj=fileobj, mode="rb")
+        if stream.read(len(MAGIC)) != MAGIC:
+            raise SnapshotError("Not a snapshot file")
+        collection = None
+        for tag, raw in _frames(stream):
+            if tag == START:
+                if collection is not None:
+                    raise SnapshotError(f"Collection {collection} is not terminated")
+                collection, count, digest = bson.decode(raw)["collection"], 0, hashlib.sha256()
+            elif tag == DOCUMENT and collection is not None:
+                digest.update(raw)
+                count += 1
+                yield collection, raw
+            elif tag == END and collection is not None:
+                footer = bson.decode(raw)
+                if footer["count"] != count or footer["sha256"] != digest.hexdigest():
+                    raise SnapshotError(
+                        f"Checksum mismatch in {collection}: expected {footer['count']} documents "
+                        f"({footer['sha256'][:12]}), read {count} ({digest.hexdigest()[:12]})"
+                    )
+                yield collection, None
+                collection = None
+            else:
+                raise SnapshotError(f"Unexpected frame {tag!r}")
+        if collection is not None:
+            raise SnapshotError(f"Snapshot is truncated inside {collection}")
+    except (OSError, EOFError, bson.errors.BSONError) as e:
+        # gzip CRC/length errors and undecodable frames
+        raise SnapshotError(f"Snapshot is corrupt: {e}") from e
@@ -0,0 +1,165 @@
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Dict, Iterator, List, Tuple
+from models.player import Player, new_trusted_player
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+CHUNK_ROWS = 5000
+SKILLS = ("pace", "shooting", "passing", "defending", "dribbling", "physical")
+REQUIRED_COLUMNS = ("name", "position", "points", "age", "preferredFoot", "nationality") + SKILLS
+OPTIONAL_COLUMNS = {"photo": "", "isSubscribed": "", "availableDates": ""}
+# Integer columns and their allowed ranges
+RANGES = {"points": (1, 99), "age": (16, 50), **{skill: (1, 99) for skill in SKILLS}}
+TRUE_VALUES = {"true", "yes", "y", "1"}
+FALSE_VALUES = {"false", "no", "n", "0", ""}
+UPLOAD_KINDS = {".csv": "csv", ".xlsx": "xlsx"}
+
+def _canonical(column: str) -> str:
+    """Header as a known column name: case and separators are ignored, skills may be prefixed"""
+    key = str(column).strip().lower().replace(" ", "").replace("_", "").replace("-", "")
+    if key.startswith("skills."):
+        key = key[len("skills."):]
+    for name in REQUIRED_COLUMNS + tuple(OPTIONAL_COLUMNS):
+        if key == name.lower():
+            return name
+    return str(column)
+
+def read_chunks(path: str, kind: str, chunk_rows: int = CHUNK_ROWS) -> Iterator["pd.DataFrame"]:
+    """
+    DataFrames of at most chunk_rows rows, every cell a string, with canonical headers.
+    CSV is read with pandas' chunked reader; XLSX rows are streamed with openpyxl in
+    read-only mode, so neither holds the whole file in memory.
+    Raises ValueError when required columns are missing.
+    """
+    import pandas as pd
+
+    def check(columns: List[str]) -> List[str]:
+        columns = [_canonical(c) for c in columns]
+        missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+        return columns
+
+    if kind == "csv":
+        # Blank lines are kept (and ignored by validate_chunk) so row numbers match the file
+        reader = pd.read_csv(
+            path, dtype=str, keep_default_na=False, chunksize=chunk_rows,
+            skipinitialspace=True, skip_blank_lines=False
+        )
+        for chunk in reader:
+            chunk.columns = check(list(chunk.columns))
+            yield chunk
+        return
+
+    from openpyxl import load_workbook
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = check(["" if c is None else c for c in header])
+        width = len(columns)
+        batch = []
+        for row in rows:
+            cells = [_cell_text(cell) for cell in row[:width]]
+            batch.append(cells + [""] * (width - len(cells)))
+            if len(batch) == chunk_rows:
+                yield pd.DataFrame(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns)
+    finally:
+        workbook.close()
+
+def _cell_text(cell) -> str:
+    if cell is None:
+        return ""
+    if isinstance(cell, (datetime, date)):
+        return cell.strftime("%Y-%m-%d")
+    return str(cell)
+
+def validate_chunk(chunk: "pd.DataFrame", first_row: int) -> Tuple[List[Player], List[int], List[str]]:
+    """
+    Validate and coerce a chunk column by column. Returns the valid rows as players,
+    their spreadsheet row numbers, and an error per invalid row listing every problem;
+    blank rows are skipped. first_row is the row number of the chunk's first row.
+    """
+    import numpy as np
+    import pandas as pd
+
+    frame = chunk.copy()
+    for column, default in OPTIONAL_COLUMNS.items():
+        if column not in frame:
+            frame[column] = default
+    text = {c: frame[c].astype(str).str.strip() for c in REQUIRED_COLUMNS + tuple(OPTIONAL_COLUMNS)}
+    problems: Dict[str, "pd.Series"] = {}
+
+    name = text["name"]
+    problems["name is required (up to 100 characters)"] = (name == "") | (name.str.len() > 100)
+    position = text["position"].str.upper()
+    problems["position must be DEF, MID or ATT"] = ~position.isin(["DEF", "MID", "ATT"])
+    foot = text["preferredFoot"].str.capitalize()
+    problems["preferredFoot must be Left or Right"] = ~foot.isin(["Left", "Right"])
+    nationality = text["nationality"]
+    problems["nationality is required (up to 50 characters)"] = (nationality == "") | (nationality.str.len() > 50)
+    problems["photo is limited to 500 characters"] = text["photo"].str.len() > 500
+
+    numbers = {}
+    for column, (low, high) in RANGES.items():
+        values = pd.to_numeric(text[column], errors="coerce")
+        # "inf" and overflowing numbers like "1e400" coerce to ±inf; treat them as unparseable
+        values = values.where(np.isfinite(values))
+        problems[f"{column} must be a whole number from {low} to {high}"] = (
+            values.isna() | (values % 1 != 0) | (values < low) | (values > high)
+        )
+        numbers[column] = values.fillna(0).astype("int64")
+
+    subscribed = text["isSubscribed"].str.lower()
+    problems["isSubscribed must be true or false"] = ~subscribed.isin(TRUE_VALUES | FALSE_VALUES)
+
+    # availableDates: ";"-separated YYYY-MM-DD, checked on the exploded column
+    dates = text["availableDates"].str.split(";").explode().str.strip()
+    dates = dates[dates != ""]
+    parsed = pd.to_datetime(dates, format="%Y-%m-%d", errors="coerce")
+    bad_dates = parsed.isna().groupby(level=0).any().reindex(frame.index, fill_value=False)
+    problems["availableDates must be YYYY-MM-DD dates separated by ;"] = bad_dates
+    iso_dates = parsed.dropna().dt.strftime("%Y-%m-%d").groupby(level=0).agg(lambda d: sorted(set(d)))
+
+    blank = pd.Series(True, index=frame.index)
+    for column in text.values():
+        blank &= column == ""
+    invalid = pd.Series(False, index=frame.index)
+    for mask in problems.values():
+        invalid |= mask
+    invalid &= ~blank
+
+    row_numbers = range(first_row, first_row + len(frame))
+    masks = [(message, mask.values) for message, mask in problems.items()]
+    errors = []
+    for position_in_chunk in invalid.values.nonzero()[0]:
+        messages = [message for message, mask in masks if mask[position_in_chunk]]
+        errors.append(f"Row {row_numbers[position_in_chunk]}: " + "; ".join(messages))
+
+    cleaned = pd.DataFrame({
+        "row": row_numbers,
+        "name": name.values,
+        "position": position.values,
+        "photo": text["photo"].values,
+        "preferredFoot": foot.values,
+        "nationality": nationality.values,
+        "isSubscribed": subscribed.isin(TRUE_VALUES).values,
+        "availableDates": iso_dates.reindex(frame.index).values,
+        **{column: values.values for column, values in numbers.items()},
+    })[~(invalid | blank).values]
+
+    players, rows = [], []
+    for record in cleaned.to_dict("records"):
+        # Every field was validated above, so build without re-validating
+        rows.append(record.pop("row"))
+        record["skills"] = {skill: record.pop(skill) for skill in SKILLS}
+        if not isinstance(record["availableDates"], list):
+            record["availableDates"] = []
+        players.append(new_trusted_player(record))
+    return players, rows, errors
@@ -0,0 +1,92 @@
+from typing import Any, Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from services.cache import cache, ROSTER
+from services.singleflight import stats_flight
+
+POSITIONS = ("DEF", "MID", "ATT")
+SKILLS = ("pace", "shooting", "passing", "defending", "dribbling", "physical")
+# Skill histogram buckets: 1-19, 20-39, ..., 80-99
+SKILL_BUCKETS = [1, 20, 40, 60, 80, 100]
+
+def stats_pipeline() -> List[Dict[str, Any]]:
+    """One aggregation computing every roster statistic, as parallel $facet branches"""
+    facets: Dict[str, Any] = {
+        "totals": [{"$group": {
+            "_id": None,
+            "players": {"$sum": 1},
+            "subscribed": {"$sum": {"$cond": ["$isSubscribed", 1, 0]}},
+            "avgPoints": {"$avg": "$points"},
+        }}],
+        "positions": [{"$group": {
+            "_id": "$position",
+            "count": {"$sum": 1},
+            "avgPoints": {"$avg": "$points"},
+            "minPoints": {"$min": "$points"},
+            "maxPoints": {"$max": "$points"},
+        }}],
+        "skills": [{"$group": {"_id": None, **{
+            f"{skill}_{op}": {f"${op}": f"$skills.{skill}"}
+            for skill in SKILLS for op in ("avg", "min", "max")
+        }}}],
+    }
+    for skill in SKILLS:
+        facets[f"buckets_{skill}"] = [{"$bucket": {
+            "groupBy": f"$skills.{skill}",
+            "boundaries": SKILL_BUCKETS,
+            "default": "other",
+            "output": {"count": {"$sum": 1}},
+        }}]
+    return [{"$facet": facets}]
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value is not None else None
+
+def shape_stats(facets: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn the $facet output into the stats response"""
+    totals = facets["totals"][0] if facets["totals"] else {"players": 0, "subscribed": 0, "avgPoints": None}
+    positions = {pos: {"count": 0, "avgPoints": None, "minPoints": None, "maxPoints": None} for pos in POSITIONS}
+    for group in facets["positions"]:
+        positions[group["_id"]] = {
+            "count": group["count"],
+            "avgPoints": _round(group["avgPoints"]),
+            "minPoints": group["minPoints"],
+            "maxPoints": group["maxPoints"],
+        }
+
+    skill_totals = facets["skills"][0] if facets["skills"] else {}
+    skills = {}
+    for skill in SKILLS:
+        counts = {bucket["_id"]: bucket["count"] for bucket in facets[f"buckets_{skill}"]}
+        skills[skill] = {
+            "avg": _round(skill_totals.get(f"{skill}_avg")),
+            "min": skill_totals.get(f"{skill}_min"),
+            "max": skill_totals.get(f"{skill}_max"),
+            "histogram": [
+                {"from": low, "to": high - 1, "count": counts.get(low, 0)}
+                for low, high in zip(SKILL_BUCKETS, SKILL_BUCKETS[1:])
+            ],
+        }
+
+    return {
+        "players": totals["players"],
+        "subscribed": totals["subscribed"],
+        "subscriptionRatio": round(totals["subscribed"] / totals["players"], 4) if totals["players"] else 0.0,
+        "avgPoints": _round(totals["avgPoints"]),
+        "positions": positions,
+        "skills": skills,
+    }
+
+async def _compute_stats(db: AsyncIOMotorDatabase, generation: int) -> Dict[str, Any]:
+    facets = (await db.players.aggregate(stats_pipeline()).to_list(1))[0]
+    stats = shape_stats(facets)
+    await cache.set(ROSTER, "stats", stats, generation)
+    return stats
+
+async def roster_stats(db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+    """Roster statistics, cached until a player changes in any worker"""
+    generation = await cache.generation(ROSTER)
+    stats = await cache.get(ROSTER, "stats")
+    if stats is not None:
+        return stats
+    return await stats_flight.do(generation, lambda: _compute_stats(db, generation))
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from models.player import player_from_db
+
+# Deletions are remembered this long; older sync tokens get a full roster instead
+TOMBSTONE_TTL = timedelta(days=30)
+
+# Tokens are issued this far in the past, so a write that started before the
+# sync query (or on a worker with a slightly late clock) is still picked up.
+# Clients may see a change twice; applying it again is harmless.
+SYNC_SLACK = timedelta(seconds=2)
+
+_EPOCH = datetime(1970, 1, 1)
+
+def encode_token(moment: datetime) -> str:
+    return str(int((moment - _EPOCH) / timedelta(milliseconds=1)))
+
+def decode_token(token: str) -> datetime:
+    """Raises ValueError for a malformed token"""
+    if not token.isdigit():
+        raise ValueError("Invalid sync token")
+    return _EPOCH + timedelta(milliseconds=int(token))
+
+async def record_tombstone(db: AsyncIOMotorDatabase, player_id: str):
+    await db.player_tombstones.update_one(
+        {"id": player_id},
+        {"$set": {"id": player_id, "deleted_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+async def player_changes(db: AsyncIOMotorDatabase, since: Optional[str]) -> Dict[str, Any]:
+    """
+    Players created or updated since the token, plus ids deleted since then.
+    Without a token, or with one older than the tombstone retention, the whole
+    roster is returned with `full: true` and the client should replace its copy.
+    Raises ValueError for a malformed token.
+    """
+    now = datetime.utcnow()
+    since_at = decode_token(since) if since else None
+    full = since_at is None or since_at < now - TOMBSTONE_TTL
+
+    if full:
+        players = await db.players.find().to_list(None)
+        deleted = []
+    else:
+        players = await db.players.find({"updated_at": {"$gte": since_at}}).to_list(None)
+        tombstones = await db.player_tombstones.find(
+            {"deleted_at": {"$gte": since_at}}, {"_id": 0, "id": 1}
+        ).to_list(None)
+        deleted = [t["id"] for t in tombstones]
+
+    return {
+        "full": full,
+        "players": [player_from_db(player) for player in players],
+        "deleted": deleted,
+        "token": encode_token(now - SYNC_SLACK),
+    }
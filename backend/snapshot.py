@@ -0,0 +1,189 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+from pathlib import Path
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from datetime import datetime
+from typing import Dict
+from pymongo import UpdateOne
+from database import create_indexes
+from services.cache import MemoryCache, ROSTER, cache
+from services.snapshot_service import SnapshotError, SnapshotWriter, read_snapshot
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+# The roster and the confirmed shuffle history; anything else is rebuilt or disposable
+DEFAULT_COLLECTIONS = ("players", "shuffles")
+# Documents come back as undecoded bytes and go out the same way
+RAW = CodecOptions(document_class=RawBSONDocument)
+# With --drop, a collection is loaded here and renamed over the live one when complete
+STAGING_SUFFIX = "__restoring"
+
+def connect():
+    mongo_url = os.environ['MONGO_URL']
+    client = AsyncIOMotorClient(mongo_url)
+    return client, client[os.environ['DB_NAME']]
+
+async def create_snapshot(path: str, collections, batch_size: int):
+    """Stream the collections, in natural order, into a compressed snapshot file"""
+    client, db = connect()
+    started = time.perf_counter()
+    tmp_path = f"{path}.partial"
+    try:
+        with open(tmp_path, "wb") as f:
+            writer = SnapshotWriter(f)
+            for name in collections:
+                writer.begin(name)
+                cursor = db.get_collection(name, codec_options=RAW).find({}, batch_size=batch_size)
+                async for doc in cursor:
+                    writer.write(doc.raw)
+                print(f"{name}: {writer.end()} documents")
+            writer.close()
+        # A crash mid-write never leaves a file that looks like a complete snapshot
+        os.replace(tmp_path, path)
+        print(f"Wrote {path} ({os.path.getsize(path) / 1e6:.1f} MB) in {time.perf_counter() - started:.1f} s")
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        client.close()
+
+def check_snapshot(path: str) -> Dict[str, int]:
+    """Document count per collection once every checksum holds; raises SnapshotError"""
+    counts = {}
+    with open(path, "rb") as f:
+        for name, raw in read_snapshot(f):
+            counts.setdefault(name, 0)
+            if raw is not None:
+                counts[name] += 1
+    return counts
+
+async def restore_snapshot(path: str, batch_size: int, parallelism: int, drop: bool):
+    """
+    Insert every document of the snapshot with unordered insert_many batches, several in
+    flight at once, while Motor's threads perform the inserts.
+    The whole file is verified before the database is touched. With drop, each collection
+    is loaded into a staging collection that replaces the live one only once complete.
+    Afterwards the indexes are rebuilt, every restored player is marked updated and the
+    players missing from the snapshot get tombstones, so delta-sync clients pick up the
+    rollback, and the roster cache generation is bumped.
+    """
+    try:
+        expected = check_snapshot(path)
+    except SnapshotError as e:
+        print(f"Snapshot rejected, database untouched: {e}")
+        sys.exit(1)
+
+    client, db = connect()
+    started = time.perf_counter()
+    slots = asyncio.Semaphore(parallelism)
+    pending = set()
+    errors = []
+
+    async def insert(target, batch):
+        try:
+            await db.get_collection(target, codec_options=RAW).insert_many(batch, ordered=False)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            slots.release()
+
+    async def flush(target, batch):
+        await slots.acquire()
+        if errors:
+            raise errors[0]
+        task = asyncio.create_task(insert(target, batch))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    async def drain():
+        await asyncio.gather(*pending)
+        if errors:
+            raise errors[0]
+
+    try:
+        previous_ids = set()
+        if drop and "players" in expected:
+            previous_ids = set(await db.players.distinct("id"))
+
+        with open(path, "rb") as f:
+            target, batch = None, []
+            for name, raw in read_snapshot(f):
+                if target is None:
+                    target = f"{name}{STAGING_SUFFIX}" if drop else name
+                    if drop:
+                        await db.drop_collection(target)  # left over from an earlier failed restore
+                if raw is not None:
+                    batch.append(RawBSONDocument(raw))
+                    if len(batch) >= batch_size:
+                        await flush(target, batch)
+                        batch = []
+                    continue
+                if batch:
+                    await flush(target, batch)
+                    batch = []
+                await drain()
+                if drop:
+                    await db[target].rename(name, dropTarget=True)
+                print(f"{name}: {expected[name]} documents")
+                target = None
+
+        if "players" in expected:
+            now = datetime.utcnow()
+            await db.players.update_many({}, {"$set": {"updated_at": now}})
+            removed = previous_ids - set(await db.players.distinct("id"))
+            if removed:
+                await db.player_tombstones.bulk_write([
+                    UpdateOne({"id": player_id}, {"$set": {"id": player_id, "deleted_at": now}}, upsert=True)
+                    for player_id in removed
+                ], ordered=False)
+        await create_indexes(db)
+        await cache.invalidate(ROSTER)
+        print(f"Restored {sum(expected.values())} documents in {time.perf_counter() - started:.1f} s")
+        if isinstance(cache, MemoryCache):
+            # Each worker's cache and search/similarity indexes live in its own memory
+            print("CACHE_BACKEND is memory: restart the server so workers drop the pre-restore roster")
+    finally:
+        for task in pending:
+            task.cancel()
+        client.close()
+
+def verify_snapshot(path: str):
+    """Check every collection's count and checksum without touching the database"""
+    try:
+        counts = check_snapshot(path)
+    except SnapshotError as e:
+        print(f"Snapshot rejected: {e}")
+        sys.exit(1)
+    for name, count in counts.items():
+        print(f"{name}: {count} documents, checksum OK")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Snapshot and restore the players collection and shuffle history")
+    commands = parser.add_subparsers(dest="command", required=True)
+    create = commands.add_parser("create", help="Write a snapshot file")
+    create.add_argument("path")
+    create.add_argument("--collections", nargs="+", default=list(DEFAULT_COLLECTIONS))
+    create.add_argument("--batch-size", type=int, default=5000)
+    restore = commands.add_parser("restore", help="Insert a snapshot's documents into the database")
+    restore.add_argument("path")
+    restore.add_argument("--batch-size", type=int, default=5000)
+    restore.add_argument("--parallelism", type=int, default=8)
+    restore.add_argument("--drop", action="store_true", help="Replace each collection instead of adding to it")
+    verify = commands.add_parser("verify", help="Check a snapshot's checksums")
+    verify.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "create":
+        asyncio.run(create_snapshot(args.path, args.collections, args.batch_size))
+    elif args.command == "restore":
+        asyncio.run(restore_snapshot(args.path, args.batch_size, args.parallelism, args.drop))
+    else:
+        verify_snapshot(args.path)
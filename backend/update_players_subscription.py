@@ -2,6 +2,7 @@ import asyncio
 import os
 import sys
 import random
+from datetime import datetime
 sys.path.append('/app/backend')
 
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -31,7 +32,7 @@ async def update_players_subscription():
             
             await db.players.update_one(
                 {"id": player["id"]},
-                {"$set": {"isSubscribed": is_subscribed}}
+                {"$set": {"isSubscribed": is_subscribed, "updated_at": datetime.utcnow()}}
             )
             
             status = "✅" if is_subscribed else "❌"
@@ -0,0 +1,85 @@
+import asyncio
+
+from services.bootstrap_service import ROSTER_PROJECTION, bootstrap, etag_matches
+from services.cache import ROSTER, cache
+from services.events import roster_events
+from services.stats_service import SKILLS
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *args):
+        return self
+
+    async def to_list(self, length):
+        await asyncio.sleep(0)
+        return self.docs
+
+class _FakePlayers:
+    def __init__(self, docs):
+        self.docs = docs
+        self.projection = None
+
+    def find(self, query, projection):
+        self.projection = projection
+        return _Cursor(self.docs)
+
+    def aggregate(self, pipeline):
+        return _Cursor([{"totals": [], "positions": [], "skills": [], **{f"buckets_{s}": [] for s in SKILLS}}])
+
+class _FakeShuffles:
+    def __init__(self, latest):
+        self.latest = latest
+
+    async def find_one(self, query, projection, sort):
+        return self.latest
+
+class _FakeDb:
+    def __init__(self, players, latest=None):
+        self.players = _FakePlayers(players)
+        self.shuffles = _FakeShuffles(latest)
+
+def _run(db):
+    async def run():
+        await cache.invalidate(ROSTER)
+        return await bootstrap(db)
+    return asyncio.run(run())
+
+def test_same_content_same_etag():
+    players = [{"id": "p1", "name": "A", "points": 70}]
+    first = _run(_FakeDb(players))
+    second = _run(_FakeDb([dict(reversed(list(players[0].items())))]))
+    assert first == second
+
+def test_any_part_changes_the_etag():
+    players = [{"id": "p1", "name": "A", "points": 70}]
+    _, base = _run(_FakeDb(players))
+    _, renamed = _run(_FakeDb([{**players[0], "name": "B"}]))
+    _, shuffled = _run(_FakeDb(players, latest={"id": "s1"}))
+    assert len({base, renamed, shuffled}) == 3
+
+def test_roster_is_projected():
+    db = _FakeDb([])
+    _run(db)
+    assert db.players.projection == ROSTER_PROJECTION
+    assert "created_at" not in ROSTER_PROJECTION
+
+class _NoDb:
+    def __getattr__(self, name):
+        raise AssertionError(f"read {name} for an unchanged bootstrap")
+
+def test_unchanged_bootstrap_is_served_from_the_cache():
+    players = [{"id": "p1", "name": "A", "points": 70}]
+    first = _run(_FakeDb(players))
+    assert asyncio.run(bootstrap(_NoDb())) == first
+    asyncio.run(roster_events.publish("update", "p1", {"name": "B"}))
+    _, renamed = asyncio.run(bootstrap(_FakeDb([{**players[0], "name": "B"}])))
+    assert renamed != first[1]
+
+def test_etag_matching():
+    assert etag_matches("abc", '"abc"')
+    assert etag_matches("abc", 'W/"abc", "def"')
+    assert etag_matches("abc", "*")
+    assert not etag_matches("abc", '"abd"')
+    assert not etag_matches("abc", None)
@@ -0,0 +1,110 @@
+import asyncio
+import multiprocessing
+
+import pytest
+
+from services.cache import CacheBackend, GenerationTracker, MemoryCache, RedisCache, SharedMemoryCache
+
+class _FakeRedis:
+    """The few commands RedisCache uses, as the asyncio client exposes them"""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value.encode()
+
+    async def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1).encode()
+        return int(self.values[key])
+
+@pytest.fixture(params=["memory", "shared", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCache(max_entries=2)
+    if request.param == "redis":
+        return RedisCache("redis://unused", client=_FakeRedis())
+    return SharedMemoryCache(str(tmp_path / "generations"), max_entries=2)
+
+def test_invalidate_drops_the_namespace_only(backend):
+    async def run():
+        await backend.set("players", "stats", 1, await backend.generation("players"))
+        await backend.set("lineups", "abc", "text", await backend.generation("lineups"))
+        await backend.invalidate("players")
+        assert await backend.get("players", "stats") is None
+        assert await backend.get("lineups", "abc") == "text"
+    asyncio.run(run())
+
+def test_values_computed_across_an_invalidation_are_not_stored(backend):
+    async def run():
+        generation = await backend.generation("players")
+        await backend.invalidate("players")
+        await backend.set("players", "stats", 1, generation)
+        assert await backend.get("players", "stats") is None
+    asyncio.run(run())
+
+def test_lru_bound(backend):
+    if isinstance(backend, RedisCache):
+        pytest.skip("Redis entries are bounded by their TTL")
+
+    async def run():
+        for key in ("a", "b", "c"):
+            await backend.set("players", key, key, await backend.generation("players"))
+        assert await backend.get("players", "a") is None
+        assert await backend.get("players", "c") == "c"
+    asyncio.run(run())
+
+def test_redis_values_round_trip_as_json():
+    async def run():
+        backend = RedisCache("redis://unused", client=_FakeRedis())
+        stats = {"players": 3, "positions": {"DEF": 1}}
+        await backend.set("players", "stats", stats, await backend.generation("players"))
+        assert await backend.get("players", "stats") == stats
+        assert backend.stats()["hits"] == {"players": 1}
+    asyncio.run(run())
+
+def test_backends_must_implement_the_interface():
+    class Partial(CacheBackend):
+        async def generation(self, namespace):
+            return 0
+
+    with pytest.raises(TypeError):
+        Partial()
+
+def _bump(path):
+    asyncio.run(SharedMemoryCache(path).invalidate("players"))
+
+def test_shared_invalidation_reaches_other_processes(tmp_path):
+    async def run():
+        path = str(tmp_path / "generations")
+        worker = SharedMemoryCache(path)
+        await worker.set("players", "roster", "[]", await worker.generation("players"))
+
+        processes = [multiprocessing.Process(target=_bump, args=(path,)) for _ in range(4)]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
+
+        assert await worker.generation("players") == 4
+        assert await worker.get("players", "roster") is None
+    asyncio.run(run())
+
+def test_tracker_tells_local_events_from_other_workers(tmp_path):
+    async def run():
+        path = str(tmp_path / "generations")
+        worker, other = SharedMemoryCache(path), SharedMemoryCache(path)
+        tracker = GenerationTracker(worker, "players")
+        assert await tracker.is_stale()
+        tracker.loaded(await tracker.begin_load())
+
+        await worker.invalidate("players")
+        tracker.local_change()
+        assert not await tracker.is_stale()
+
+        await other.invalidate("players")
+        assert await tracker.is_stale()
+    asyncio.run(run())
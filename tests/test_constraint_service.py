@@ -0,0 +1,84 @@
+import random
+import time
+
+import pytest
+
+from models.player import Player
+from services.constraint_service import shuffle_teams_constrained, SearchBudgetExceeded, GREEDY_MAX_NODES
+
+SKILLS = {"pace": 50, "shooting": 50, "passing": 50, "defending": 50, "dribbling": 50, "physical": 50}
+
+def make_players(n, seed=0):
+    rng = random.Random(seed)
+    return [
+        Player(
+            id=f"p{i}", name=f"Player {i}", position=("DEF", "ATT", "MID")[i % 3],
+            points=rng.randint(50, 95), photo="x", skills=SKILLS, age=25,
+            preferredFoot="Right", nationality="India"
+        )
+        for i in range(n)
+    ]
+
+def team_ids(result, team):
+    return {p["id"] for p in result[team]["players"]}
+
+def test_must_link_and_cannot_link_are_honoured():
+    players = make_players(16)
+    result = shuffle_teams_constrained(
+        players,
+        must_link=[("p0", "p1"), ("p1", "p2")],
+        cannot_link=[("p0", "p3"), ("p4", "p5")],
+        rng=random.Random(1)
+    )
+    team1, team2 = team_ids(result, "team1"), team_ids(result, "team2")
+    assert len(team1) == len(team2) == 8
+    same = team1 if "p0" in team1 else team2
+    assert {"p0", "p1", "p2"} <= same
+    assert "p3" not in same
+    assert ("p4" in team1) != ("p5" in team1)
+
+def test_position_minimums_per_team():
+    result = shuffle_teams_constrained(make_players(30), min_positions={"DEF": 4, "ATT": 4, "MID": 3})
+    for team in ("team1", "team2"):
+        positions = [p["position"] for p in result[team]["players"]]
+        assert positions.count("DEF") >= 4
+        assert positions.count("ATT") >= 4
+        assert positions.count("MID") >= 3
+
+def test_balances_points():
+    result = shuffle_teams_constrained(make_players(20), time_budget_ms=50)
+    assert abs(result["team1"]["totalPoints"] - result["team2"]["totalPoints"]) <= 2
+
+@pytest.mark.parametrize("must_link, cannot_link, message", [
+    ([("p0", "p1")], [("p1", "p0")], "linked to the same team"),
+    ([], [("p0", "p1"), ("p1", "p2"), ("p0", "p2")], "odd cycle"),
+    ([(f"p{i}", f"p{i + 1}") for i in range(0, 30, 2)], [], "equal in size"),
+    ([], [("p0", "nobody")], "not in the shuffle"),
+])
+def test_infeasible_constraints_are_reported(must_link, cannot_link, message):
+    started = time.perf_counter()
+    with pytest.raises(ValueError, match=message):
+        shuffle_teams_constrained(make_players(30), must_link, cannot_link)
+    assert time.perf_counter() - started < 0.05
+
+def test_not_enough_players_for_minimums():
+    with pytest.raises(ValueError, match="MID players are required"):
+        shuffle_teams_constrained(make_players(16), min_positions={"DEF": 2, "ATT": 2, "MID": 4})
+
+def test_odd_player_count():
+    with pytest.raises(ValueError, match="even number"):
+        shuffle_teams_constrained(make_players(17))
+
+def test_greedy_split_is_cheap_and_valid():
+    players = make_players(30)
+    started = time.perf_counter()
+    result = shuffle_teams_constrained(
+        players, must_link=[("p0", "p1")], cannot_link=[("p2", "p3")],
+        time_budget_ms=0, max_nodes=GREEDY_MAX_NODES
+    )
+    assert time.perf_counter() - started < 0.01
+    assert len(team_ids(result, "team1")) == 15
+
+def test_running_out_of_budget_is_not_reported_as_infeasible():
+    with pytest.raises(SearchBudgetExceeded):
+        shuffle_teams_constrained(make_players(30), max_nodes=1)
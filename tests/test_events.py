@@ -0,0 +1,52 @@
+import asyncio
+
+from services.events import RosterBroadcaster
+
+def drain(queue):
+    frames = []
+    while not queue.empty():
+        frames.append(queue.get_nowait())
+    return frames
+
+def test_publish_reaches_every_subscriber():
+    async def run():
+        broadcaster = RosterBroadcaster()
+        first, second = broadcaster.subscribe(), broadcaster.subscribe()
+        await broadcaster.publish("update", "p1", {"points": 80})
+        assert drain(first) == drain(second)
+        broadcaster.unsubscribe(first)
+        await broadcaster.publish("delete", "p1")
+        assert drain(first) == []
+        assert '"type": "delete"' in drain(second)[0]
+    asyncio.run(run())
+
+def test_last_event_id_replays_missed_frames():
+    async def run():
+        broadcaster = RosterBroadcaster()
+        for points in (70, 71, 72):
+            await broadcaster.publish("update", "p1", {"points": points})
+        queue = broadcaster.subscribe(f"{broadcaster.epoch}-1")
+        frames = drain(queue)
+        assert len(frames) == 2
+        assert frames[0].startswith(f"id: {broadcaster.epoch}-2\n")
+    asyncio.run(run())
+
+def test_unknown_last_event_id_resets_client():
+    async def run():
+        broadcaster = RosterBroadcaster()
+        await broadcaster.publish("create", "p1", {"name": "A"})
+        for stale in ("otherepoch-1", f"{broadcaster.epoch}-5", "garbage"):
+            frames = drain(broadcaster.subscribe(stale))
+            assert len(frames) == 1 and "event: reset" in frames[0]
+    asyncio.run(run())
+
+def test_slow_subscriber_drops_oldest():
+    async def run():
+        broadcaster = RosterBroadcaster(queue_size=2)
+        queue = broadcaster.subscribe()
+        for points in (1, 2, 3):
+            await broadcaster.publish("update", "p1", {"points": points})
+        frames = drain(queue)
+        assert len(frames) == 2 and '"points": 3' in frames[-1]
+        assert broadcaster.dropped == 1
+    asyncio.run(run())
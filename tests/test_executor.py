@@ -0,0 +1,33 @@
+import asyncio
+import time
+
+import pytest
+
+from services.executor import ShuffleExecutor, PoolBusyError
+
+def test_deadline_answers_with_fallback():
+    async def run():
+        executor = ShuffleExecutor(max_workers=1, max_pending=2)
+        try:
+            result = await executor.run(time.sleep, 0.5, timeout=0.05, fallback=lambda: "greedy")
+            assert result == ("greedy", True)
+            # The late job still occupies its slot until the worker finishes it
+            assert executor.pending == 1
+            assert await executor.run(abs, -3, timeout=5, fallback=lambda: None) == (3, False)
+        finally:
+            executor.shutdown()
+    asyncio.run(run())
+
+def test_full_queue_is_rejected():
+    async def run():
+        executor = ShuffleExecutor(max_workers=1, max_pending=1)
+        try:
+            slow = asyncio.ensure_future(executor.run(time.sleep, 0.2, timeout=5, fallback=lambda: None))
+            await asyncio.sleep(0)
+            with pytest.raises(PoolBusyError):
+                await executor.run(abs, -1, timeout=5, fallback=lambda: None)
+            await slow
+            assert executor.stats()["rejected"] == 1
+        finally:
+            executor.shutdown()
+    asyncio.run(run())
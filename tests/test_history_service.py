@@ -0,0 +1,25 @@
+from datetime import datetime
+
+import pytest
+
+from models.shuffle import ShuffleRecord, TeamRecord
+from services.history_service import pair_key, teammate_updates, encode_cursor, decode_cursor
+
+def test_pair_key_is_order_independent():
+    assert pair_key("a", "b") == pair_key("b", "a") == "a|b"
+
+def test_teammate_updates_one_per_pair():
+    updates = teammate_updates([["a", "b", "c"], ["d", "e"]])
+    keys = sorted(u._filter["_id"] for u in updates)
+    assert keys == ["a|b", "a|c", "b|c", "d|e"]
+
+def test_cursor_round_trip():
+    team = TeamRecord(playerIds=[], totalPoints=0, formation="0-0-0")
+    record = ShuffleRecord(id="r1", team1=team, team2=team, created_at=datetime(2026, 10, 1, 12, 0, 0, 123000))
+    assert decode_cursor(encode_cursor(record)) == (record.created_at, "r1")
+
+def test_malformed_cursor():
+    with pytest.raises(ValueError):
+        decode_cursor("2026-10-01T12:00:00")
+    with pytest.raises(ValueError):
+        decode_cursor("junk|r1")
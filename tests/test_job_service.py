@@ -0,0 +1,123 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from services.job_service import JobRunner, HEARTBEAT_TIMEOUT
+
+class _FakeJobs:
+    def __init__(self):
+        self.docs = {}
+
+    async def insert_one(self, doc):
+        self.docs[doc["id"]] = dict(doc)
+
+    async def replace_one(self, query, doc):
+        self.docs[query["id"]] = dict(doc)
+
+    async def update_many(self, query, update):
+        class _Result:
+            modified_count = 0
+        result = _Result()
+        for doc in self.docs.values():
+            if "status" in query and doc["status"] in query["status"]["$nin"]:
+                continue
+            if "$or" in query and doc.get("heartbeat_at") and doc["heartbeat_at"] >= query["$or"][1]["heartbeat_at"]["$lt"]:
+                continue
+            if isinstance(query["id"], dict) and "$in" in query["id"] and doc["id"] not in query["id"]["$in"]:
+                continue
+            if isinstance(query["id"], dict) and "$nin" in query["id"] and doc["id"] in query["id"]["$nin"]:
+                continue
+            doc.update(update["$set"])
+            result.modified_count += 1
+        return result
+
+class _FakeDb:
+    def __init__(self):
+        self.jobs = _FakeJobs()
+
+def test_progress_result_and_persistence():
+    async def main():
+        db, runner = _FakeDb(), JobRunner()
+
+        async def body(ctx):
+            await ctx.progress(succeeded=2)
+            await ctx.progress(failed=1, errors=["row 3 bad"])
+            return {"created": 2}
+
+        job = await runner.submit(db, "import", 3, body)
+        queue = runner.subscribe(job.id)
+        await asyncio.sleep(0.05)
+        stored = db.jobs.docs[job.id]
+        assert (stored["status"], stored["processed"], stored["succeeded"], stored["failed"]) == ("succeeded", 3, 2, 1)
+        assert stored["errors"] == ["row 3 bad"] and stored["result"] == {"created": 2}
+        snapshots = [queue.get_nowait() for _ in range(queue.qsize())]
+        assert snapshots[-1]["status"] == "succeeded"
+        assert runner.get(job.id) is None
+        await runner.shutdown()
+    asyncio.run(main())
+
+def test_concurrency_limit():
+    async def main():
+        db, runner = _FakeDb(), JobRunner(max_concurrent=2)
+        running = peak = 0
+
+        async def body(ctx):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        jobs = [await runner.submit(db, "batch_shuffle", 1, body) for _ in range(5)]
+        await asyncio.sleep(0.1)
+        assert peak == 2
+        assert all(db.jobs.docs[job.id]["status"] == "succeeded" for job in jobs)
+        await runner.shutdown()
+    asyncio.run(main())
+
+def test_failed_job_records_the_error():
+    async def main():
+        db, runner = _FakeDb(), JobRunner()
+
+        async def body(ctx):
+            raise RuntimeError("boom")
+
+        job = await runner.submit(db, "bulk_update", 1, body)
+        await asyncio.sleep(0.05)
+        assert db.jobs.docs[job.id]["status"] == "failed"
+        assert db.jobs.docs[job.id]["errors"] == ["Job failed: boom"]
+        await runner.shutdown()
+    asyncio.run(main())
+
+def test_recover_only_interrupts_jobs_without_a_live_heartbeat():
+    async def main():
+        db, runner = _FakeDb(), JobRunner()
+        now = datetime.utcnow()
+        db.jobs.docs = {
+            "stale": {"id": "stale", "status": "running", "heartbeat_at": now - 2 * HEARTBEAT_TIMEOUT},
+            "alive": {"id": "alive", "status": "running", "heartbeat_at": now - timedelta(seconds=1)},
+            "done": {"id": "done", "status": "succeeded", "heartbeat_at": None},
+        }
+        assert await runner.recover(db) == 1
+        assert [db.jobs.docs[i]["status"] for i in ("stale", "alive", "done")] == ["interrupted", "running", "succeeded"]
+    asyncio.run(main())
+
+def test_cleanup_runs_for_finished_and_cancelled_jobs():
+    async def main():
+        db, runner = _FakeDb(), JobRunner(max_concurrent=1)
+        cleaned = []
+        release = asyncio.Event()
+
+        async def body(ctx):
+            await release.wait()
+
+        running = await runner.submit(db, "import", 0, body, cleanup=lambda: cleaned.append("running"))
+        queued = await runner.submit(db, "import", 0, body, cleanup=lambda: cleaned.append("queued"))
+        await asyncio.sleep(0.01)
+        runner._tasks[queued.id].cancel()
+        await asyncio.sleep(0.01)
+        assert cleaned == ["queued"]
+        release.set()
+        await asyncio.sleep(0.01)
+        assert cleaned == ["queued", "running"]
+        await runner.shutdown()
+    asyncio.run(main())
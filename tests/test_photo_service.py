@@ -0,0 +1,67 @@
+import asyncio
+import io
+import threading
+
+from PIL import Image
+
+from services.photo_service import PhotoSource, PhotoService, ThumbnailCache, THUMBNAIL_SIZES
+
+def jpeg(width, height):
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(out, "JPEG")
+    return out.getvalue()
+
+class StubSource(PhotoSource):
+    def __init__(self, photos):
+        self.photos = photos
+        self.reads = 0
+        self.threads = set()
+
+    def version(self, player_id):
+        self.threads.add(threading.get_ident())
+        return "v1" if player_id in self.photos else None
+
+    def read(self, player_id):
+        self.threads.add(threading.get_ident())
+        self.reads += 1
+        return self.photos.get(player_id)
+
+def test_thumbnails_are_resized_and_cached(tmp_path):
+    source = StubSource({"p1": jpeg(400, 600)})
+    service = PhotoService(source, ThumbnailCache(tmp_path, max_bytes=10_000_000))
+
+    async def run():
+        etag = await service.etag("p1", "sm")
+        first = await service.thumbnail("p1", "sm", etag)
+        second = await service.thumbnail("p1", "sm", etag)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == second
+    assert Image.open(io.BytesIO(first)).size == THUMBNAIL_SIZES["sm"]
+    assert source.reads == 1
+    assert service.cache.stats()["hits"] == 1
+    # Stat calls and reads never run on the event loop's thread
+    assert threading.get_ident() not in source.threads
+
+def test_etag_depends_on_size_and_photo(tmp_path):
+    service = PhotoService(StubSource({"p1": b""}), ThumbnailCache(tmp_path, max_bytes=1000))
+
+    async def run():
+        assert await service.etag("p1", "sm") != await service.etag("p1", "md")
+        assert await service.etag("missing", "sm") is None
+    asyncio.run(run())
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ThumbnailCache(tmp_path, max_bytes=250)
+    cache.put("a", b"x" * 100)
+    cache.put("b", b"x" * 100)
+    assert cache.get("a") is not None
+    cache.put("c", b"x" * 100)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert not (tmp_path / "b.jpg").exists()
+
+def test_cache_survives_restart(tmp_path):
+    ThumbnailCache(tmp_path, max_bytes=1000).put("a", b"x" * 10)
+    assert ThumbnailCache(tmp_path, max_bytes=1000).get("a") == b"x" * 10
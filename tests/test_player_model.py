@@ -0,0 +1,51 @@
+from models.player import SCHEMA_VERSION, Player, derived_ratings, new_trusted_player, player_from_db
+
+def _doc(**overrides):
+    player = Player(
+        name="Ann", position="MID", points=70, photo="x",
+        skills={"pace": 1, "shooting": 2, "passing": 3, "defending": 4, "dribbling": 5, "physical": 6},
+        age=30, preferredFoot="Left", nationality="Spain",
+    )
+    return {"_id": "mongo-id", **player.model_dump(), **overrides}
+
+def test_trusted_read_matches_validated_read():
+    doc = _doc()
+    trusted = player_from_db(doc)
+    validated = Player(**doc)
+    assert trusted == validated
+    assert trusted.model_dump_json() == validated.model_dump_json()
+    assert trusted.skills.passing == 3
+
+def test_trusted_read_does_not_share_the_document():
+    doc = _doc()
+    player = player_from_db(doc)
+    player.skills.pace = 99
+    assert doc["skills"]["pace"] == 1 and "_id" in doc
+
+def test_legacy_documents_are_validated():
+    legacy = _doc(points=70.0)
+    del legacy["schemaVersion"], legacy["availableDates"]
+    player = player_from_db(legacy)
+    assert player.points == 70 and isinstance(player.points, int)
+    assert player.availableDates == [] and player.schemaVersion == SCHEMA_VERSION
+
+def test_incomplete_current_documents_are_validated():
+    doc = _doc()
+    del doc["gamesPlayed"]
+    assert player_from_db(doc).gamesPlayed == 0
+
+def test_derived_ratings_are_computed_on_construction():
+    player = Player(**{k: v for k, v in _doc().items() if k not in ("_id", "overall", "attack")})
+    assert player.overall == 3.5
+    assert player.positionRating == round(3 * 0.35 + 5 * 0.25 + 6 * 0.15 + 4 * 0.15 + 2 * 0.1, 1)
+    assert player.attack == round(2 * 0.35 + 5 * 0.25 + 1 * 0.25 + 3 * 0.15, 1) and player.defence == 4.0
+
+def test_derived_ratings_follow_position():
+    skills = {"pace": 50, "shooting": 90, "passing": 60, "defending": 30, "dribbling": 80, "physical": 50}
+    assert derived_ratings(skills, "ATT")["positionRating"] > derived_ratings(skills, "DEF")["positionRating"]
+    assert derived_ratings(skills, "ATT")["overall"] == derived_ratings(skills, "DEF")["overall"]
+
+def test_trusted_new_players_carry_derived_ratings():
+    doc = _doc()
+    fields = {k: doc[k] for k in ("name", "position", "points", "photo", "skills", "age", "preferredFoot", "nationality")}
+    assert new_trusted_player(fields).positionRating == doc["positionRating"]
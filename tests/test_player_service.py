@@ -0,0 +1,47 @@
+import asyncio
+
+from models.player import DERIVED_FIELDS, SCHEMA_VERSION
+from services.player_service import backfill_derived_ratings
+
+SKILLS = {"pace": 1, "shooting": 2, "passing": 3, "defending": 4, "dribbling": 5, "physical": 6}
+
+class _Players:
+    def __init__(self, docs):
+        self.docs = docs
+        self.writes = []
+
+    async def find(self, query, projection, batch_size):
+        for doc in self.docs:
+            yield doc
+
+    async def bulk_write(self, requests, ordered):
+        self.writes.extend(requests)
+        return type("Result", (), {"modified_count": len(requests)})()
+
+class _Db:
+    def __init__(self, docs):
+        self.players = _Players(docs)
+
+def _legacy(player_id, **overrides):
+    return {
+        "id": player_id, "name": player_id, "position": "MID", "points": 70, "photo": "x",
+        "skills": dict(SKILLS), "age": 30, "preferredFoot": "Left", "nationality": "Spain",
+        **overrides,
+    }
+
+def test_backfill_sets_only_derived_fields_guarded_by_what_it_read():
+    db = _Db([_legacy("a"), _legacy("b", skills={"pace": 1})])
+    updated, errors = asyncio.run(backfill_derived_ratings(db, batch_size=10))
+    assert updated == 1 and len(errors) == 1 and errors[0].startswith("Player b")
+
+    (write,) = db.players.writes
+    assert write._filter == {
+        "schemaVersion": {"$ne": SCHEMA_VERSION}, "id": "a", "skills": SKILLS, "position": "MID"
+    }
+    assert set(write._doc["$set"]) == {*DERIVED_FIELDS, "schemaVersion", "updated_at"}
+    assert write._doc["$set"]["overall"] == 3.5
+
+def test_backfill_dry_run_writes_nothing():
+    db = _Db([_legacy("a"), _legacy("b")])
+    assert asyncio.run(backfill_derived_ratings(db, batch_size=1, dry_run=True)) == (2, [])
+    assert db.players.writes == []
@@ -0,0 +1,93 @@
+import asyncio
+import random
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from services import rating_service
+from services.rating_service import rating_updates, team_delta, points_for_rating
+from services.rating_replay import replay_ratings
+
+def test_replay_matches_live_updates():
+    rng = random.Random(3)
+    seeds = {f"p{i}": float(rng.randint(40, 90)) for i in range(20)}
+    live = {}
+    matches = []
+    for _ in range(50):
+        lineup = rng.sample(sorted(seeds), 16)
+        match = {"team1": lineup[:8], "team2": lineup[8:], "team1Score": rng.randint(0, 5), "team2Score": rng.randint(0, 5)}
+        matches.append(match)
+
+        def doc(player_id):
+            return {"id": player_id, "points": points_for_rating(seeds[player_id]), "rating": live.get(player_id, seeds[player_id])}
+
+        changes, updates = rating_updates(
+            [doc(i) for i in match["team1"]], [doc(i) for i in match["team2"]],
+            match["team1Score"], match["team2Score"]
+        )
+        assert len(updates) == 16
+        for player_id, delta in changes.items():
+            live[player_id] = live.get(player_id, seeds[player_id]) + delta
+
+    replayed = replay_ratings(seeds, matches)
+    for player_id, rating in live.items():
+        assert replayed[player_id] == pytest.approx(rating)
+
+def test_team_delta_is_zero_sum_and_signed():
+    assert team_delta(60, 60, 2, 1) > 0
+    assert team_delta(60, 60, 1, 2) == -team_delta(60, 60, 2, 1)
+    assert team_delta(60, 60, 1, 1) == 0
+    # An expected win earns less than an upset
+    assert team_delta(80, 50, 1, 0) < team_delta(50, 80, 1, 0)
+
+def test_points_are_clamped():
+    assert points_for_rating(120.4) == 99
+    assert points_for_rating(-3) == 1
+    assert points_for_rating(71.6) == 72
+
+class _Locks:
+    """Just enough of a collection for the lease: one document per _id"""
+
+    def __init__(self):
+        self.docs = {}
+
+    async def update_one(self, query, update, upsert=False):
+        doc = self.docs.get(query["_id"])
+        if doc is not None and doc["expires_at"] >= query["expires_at"]["$lt"]:
+            raise DuplicateKeyError("lease held")
+        self.docs[query["_id"]] = {**update["$set"]}
+
+    async def delete_one(self, query):
+        doc = self.docs.get(query["_id"])
+        if doc is not None and doc["owner"] == query["owner"]:
+            del self.docs[query["_id"]]
+
+def test_match_lease_serializes_holders(monkeypatch):
+    monkeypatch.setattr(rating_service, "LEASE_POLL_SECONDS", 0)
+    db = SimpleNamespace(locks=_Locks())
+    order = []
+
+    async def hold(name):
+        async with rating_service.match_lease(db):
+            order.append(f"{name} in")
+            await asyncio.sleep(0.01)
+            order.append(f"{name} out")
+
+    async def main():
+        await asyncio.gather(hold("a"), hold("b"))
+
+    asyncio.run(main())
+    assert order in (["a in", "a out", "b in", "b out"], ["b in", "b out", "a in", "a out"])
+    assert db.locks.docs == {}
+
+def test_lapsed_match_lease_is_taken_over():
+    db = SimpleNamespace(locks=_Locks())
+    db.locks.docs["matches"] = {"owner": "crashed", "expires_at": datetime(2000, 1, 1)}
+
+    async def main():
+        async with rating_service.match_lease(db):
+            assert db.locks.docs["matches"]["owner"] != "crashed"
+
+    asyncio.run(main())
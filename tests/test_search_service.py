@@ -0,0 +1,36 @@
+from services.search_service import PlayerSearchIndex
+
+def _player(player_id, name, nationality="England", **fields):
+    return {"id": player_id, "name": name, "nationality": nationality, "position": "MID", "points": 70, **fields}
+
+def _index(*players):
+    index = PlayerSearchIndex()
+    index.load(players)
+    return index
+
+def test_prefix_of_any_word_and_accents():
+    index = _index(_player("1", "José Silva", "Brazil"), _player("2", "Joe Hart"), _player("3", "Ann Lee"))
+    assert [p["id"] for p in index.search("jo")] == ["2", "1"]
+    assert [p["id"] for p in index.search("sil")] == ["1"]
+    assert [p["id"] for p in index.search("braz")] == ["1"]
+
+def test_every_term_must_match():
+    index = _index(_player("1", "Harry Kane"), _player("2", "Harry Maguire"))
+    assert [p["id"] for p in index.search("harry ka")] == ["1"]
+    assert index.search("harry zz") == []
+
+def test_infix_matches_rank_below_prefix_matches():
+    index = _index(_player("1", "Ronaldo"), _player("2", "Aldous"))
+    assert [p["id"] for p in index.search("ald")] == ["2", "1"]
+    assert index.search("odl") == []
+
+def test_incremental_updates():
+    index = _index(_player("1", "Harry Kane"))
+    index.on_roster_event({"type": "update", "id": "1", "fields": {"name": "Jude Bellingham"}})
+    assert index.search("harry") == []
+    assert index.search("bell")[0]["points"] == 70
+    index.on_roster_event({"type": "create", "id": "2", "fields": _player("2", "Jude Law")})
+    assert len(index.search("jude")) == 2
+    index.on_roster_event({"type": "delete", "id": "1"})
+    assert [p["id"] for p in index.search("jude")] == ["2"]
+    assert "bell" not in index._tables["name_word"]
@@ -0,0 +1,52 @@
+import asyncio
+from datetime import date
+
+from models.shuffle import GameDetails
+from services.share_service import render_share_text, share_code, share_text, upcoming_sunday
+
+def test_upcoming_sunday_is_never_today():
+    assert upcoming_sunday(date(2025, 8, 20)) == "24th August, 2025"
+    assert upcoming_sunday(date(2025, 8, 24)) == "31st August, 2025"
+    assert upcoming_sunday(date(2025, 8, 30)) == "31st August, 2025"
+    assert upcoming_sunday(date(2026, 10, 5)) == "11th October, 2026"
+
+def test_render_matches_frontend_message():
+    text = render_share_text(["A", "B"], ["C"], GameDetails(date="1st June, 2025", venue="Park"))
+    assert text.startswith("*⚠ SUNDAY MORNING ⚠*\n*1st June, 2025*\n*👉 Time:- 7:00 - 8:30 AM*\n*👉 Venue:- Park*\n*220₹pp*\n\n")
+    assert "*Team A: Black/Dark*\n\n1.​ A\n2.​ B\nWaiting:\n9.​ TBD\n\n" in text
+    assert "*Team B: White/Light*\n\n1.​ C\n" in text
+    assert text.endswith("🔥🔥Game On🔥🔥")
+
+def _teams(*names):
+    return {"team1": [{"id": n.lower(), "name": n} for n in names[:1]], "team2": [{"id": n.lower(), "name": n} for n in names[1:]]}
+
+def test_share_code_depends_on_lineup_and_details():
+    teams = _teams("A", "B")
+    code = share_code(teams, GameDetails(venue="Park"))
+    assert len(code) == 8
+    assert code == share_code(teams, GameDetails(venue="Park"))
+    assert code != share_code(teams, GameDetails(venue="Field"))
+    assert code != share_code(_teams("B", "A"), GameDetails(venue="Park"))
+
+class _FakeShares:
+    def __init__(self, doc):
+        self.doc = doc
+
+    async def find_one(self, query, projection):
+        return self.doc if query["code"] == self.doc["code"] else None
+
+class _NoPlayers:
+    def __getattr__(self, name):
+        raise AssertionError("a saved share must not read the current roster")
+
+class _FakeDb:
+    def __init__(self, doc):
+        self.shares = _FakeShares(doc)
+        self.players = _NoPlayers()
+        self.shuffles = _NoPlayers()
+
+def test_saved_shares_render_from_their_own_lineup():
+    doc = {"code": "frozen01", "source": {"playerIds": ["a", "b"], "seed": 1}, "teams": _teams("Ann", "Bob"),
+           "details": {"date": "1st June, 2025"}}
+    text = asyncio.run(share_text(_FakeDb(doc), "frozen01"))
+    assert "1.​ Ann\n" in text and "1.​ Bob\n" in text
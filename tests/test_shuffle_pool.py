@@ -0,0 +1,33 @@
+from datetime import datetime
+
+import pytest
+
+from services.shuffle_service import select_pool, POSITION_MINIMUMS, SQUAD_SIZE
+
+def candidate(i, position, games=0, last=None):
+    return {"id": f"p{i}", "position": position, "gamesPlayed": games, "lastPlayedAt": last}
+
+def test_fewest_games_are_preferred():
+    candidates = [candidate(i, ("DEF", "ATT", "MID")[i % 3], games=i) for i in range(24)]
+    selected = select_pool(candidates)
+    assert len(selected) == SQUAD_SIZE
+    assert set(selected) == {f"p{i}" for i in range(SQUAD_SIZE)}
+
+def test_position_minimums_are_filled_first():
+    candidates = [candidate(i, "MID") for i in range(16)]
+    candidates += [candidate(100 + i, "DEF", games=5) for i in range(4)]
+    candidates += [candidate(200 + i, "ATT", games=5) for i in range(4)]
+    by_id = {c["id"]: c for c in candidates}
+    positions = [by_id[i]["position"] for i in select_pool(candidates)]
+    for position, minimum in POSITION_MINIMUMS.items():
+        assert positions.count(position) >= minimum
+
+def test_older_last_game_breaks_ties():
+    candidates = [candidate(i, ("DEF", "ATT", "MID")[i % 3], games=1, last=datetime(2026, 1, 1 + i)) for i in range(17)]
+    assert "p16" not in select_pool(candidates)
+
+def test_not_enough_candidates():
+    with pytest.raises(ValueError, match="At least 16"):
+        select_pool([candidate(i, "DEF") for i in range(10)])
+    with pytest.raises(ValueError, match="MID"):
+        select_pool([candidate(i, ("DEF", "ATT")[i % 2]) for i in range(20)])
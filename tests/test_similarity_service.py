@@ -0,0 +1,46 @@
+import pytest
+
+from services.similarity_service import PlayerSimilarityIndex
+
+def _player(player_id, position="MID", points=70, skill=70, subscribed=True):
+    skills = dict.fromkeys(("pace", "shooting", "passing", "defending", "dribbling", "physical"), skill)
+    return {"id": player_id, "name": player_id, "position": position, "points": points,
+            "skills": skills, "isSubscribed": subscribed}
+
+def _ids(results):
+    return [p["id"] for p in results]
+
+def test_nearest_first_and_excludes_the_player():
+    index = PlayerSimilarityIndex()
+    index.load([_player("a"), _player("b", points=72), _player("c", points=90, skill=90), _player("d", points=60)])
+    results = index.similar("a", k=2)
+    assert _ids(results) == ["b", "d"]
+    assert results[0]["distance"] < results[1]["distance"]
+    assert index.similar("missing") is None
+
+def test_filters():
+    index = PlayerSimilarityIndex()
+    index.load([_player("a"), _player("b", position="DEF"), _player("c", points=50, subscribed=False),
+                _player("d", points=40)])
+    # Another position outweighs a 30 point gap
+    assert _ids(index.similar("a", k=5)) == ["c", "d", "b"]
+    assert _ids(index.similar("a", k=5, same_position=True)) == ["c", "d"]
+    assert _ids(index.similar("a", k=5, same_position=True, subscribed_only=True)) == ["d"]
+
+def test_incremental_updates_match_a_rebuild():
+    index = PlayerSimilarityIndex()
+    players = [_player(str(i), points=20 + i, skill=30 + 2 * i) for i in range(100)]
+    index.load(players)
+    index.on_roster_event({"type": "delete", "id": "3"})
+    index.on_roster_event({"type": "update", "id": "50", "fields": {"points": 99}})
+    index.on_roster_event({"type": "create", "id": "new", "fields": _player("new", points=21, skill=32)})
+
+    rebuilt = PlayerSimilarityIndex()
+    expected = [p for p in players if p["id"] != "3"] + [_player("new", points=21, skill=32)]
+    expected[49] = {**expected[49], "points": 99}
+    rebuilt.load(expected)
+
+    for player_id in ("0", "50", "99", "new"):
+        got, want = index.similar(player_id, k=10), rebuilt.similar(player_id, k=10)
+        assert [p["distance"] for p in got] == pytest.approx([p["distance"] for p in want])
+    assert len(index) == 100
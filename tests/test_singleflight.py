@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from services.singleflight import SingleFlight
+
+def test_concurrent_calls_share_one_result():
+    async def run():
+        flight = SingleFlight("test")
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        results = await asyncio.gather(*[flight.do("k", work) for _ in range(10)])
+        assert results == [1] * 10
+        assert flight.stats()["shared"] == 9 and flight.stats()["inflight"] == 0
+        # Nothing is cached once the call is done
+        assert await flight.do("k", work) == 2
+    asyncio.run(run())
+
+def test_exceptions_reach_every_caller():
+    async def run():
+        flight = SingleFlight("test")
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(*[flight.do("k", fail) for _ in range(3)], return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+    asyncio.run(run())
+
+def test_cancelled_caller_does_not_cancel_followers():
+    async def run():
+        flight = SingleFlight("test")
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert await follower == "done"
+    asyncio.run(run())
@@ -0,0 +1,64 @@
+import gzip
+import io
+
+import bson
+import pytest
+
+from services.snapshot_service import SnapshotError, SnapshotWriter, read_snapshot
+
+def _snapshot(collections):
+    buffer = io.BytesIO()
+    writer = SnapshotWriter(buffer)
+    for name, docs in collections.items():
+        writer.begin(name)
+        for doc in docs:
+            writer.write(bson.encode(doc))
+        writer.end()
+    writer.close()
+    return buffer.getvalue()
+
+def _read(data):
+    result = {}
+    for name, raw in read_snapshot(io.BytesIO(data)):
+        result.setdefault(name, [])
+        if raw is not None:
+            result[name].append(bson.decode(raw))
+    return result
+
+def test_round_trip_keeps_documents_and_order():
+    collections = {
+        "players": [{"id": f"p{i}", "skills": {"pace": i}, "dates": ["2026-10-25"]} for i in range(100)],
+        "shuffles": [],
+    }
+    assert _read(_snapshot(collections)) == collections
+
+def _rewrite(data, old, new):
+    raw = gzip.decompress(data)
+    assert old in raw
+    return gzip.compress(raw.replace(old, new, 1))
+
+def test_altered_document_fails_the_checksum():
+    data = _rewrite(_snapshot({"players": [{"name": "Ann"}, {"name": "Bob"}]}), b"Bob", b"Rob")
+    with pytest.raises(SnapshotError, match="Checksum mismatch in players"):
+        _read(data)
+
+def test_missing_document_fails_the_count():
+    one = bson.encode({"name": "Ann"})
+    data = _rewrite(_snapshot({"players": [{"name": "Ann"}, {"name": "Ann"}]}), b"D" + one + b"D" + one, b"D" + one)
+    with pytest.raises(SnapshotError, match="expected 2 documents"):
+        _read(data)
+
+def test_truncated_and_foreign_files_are_rejected():
+    data = gzip.decompress(_snapshot({"players": [{"name": "Ann"}]}))
+    with pytest.raises(SnapshotError, match="truncated"):
+        _read(gzip.compress(data[:-10]))
+    with pytest.raises(SnapshotError, match="Not a snapshot"):
+        _read(gzip.compress(b"players.json" * 4))
+    with pytest.raises(SnapshotError, match="corrupt"):
+        _read(b"not gzip at all")
+
+def test_collections_must_be_ended():
+    writer = SnapshotWriter(io.BytesIO())
+    writer.begin("players")
+    with pytest.raises(SnapshotError):
+        writer.close()
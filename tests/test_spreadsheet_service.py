@@ -0,0 +1,72 @@
+from datetime import datetime
+
+import pytest
+
+from models.player import Player
+from services.spreadsheet_service import read_chunks, validate_chunk
+
+HEADER = "Name,Position,Points,Age,Preferred Foot,Nationality,skills.pace,Shooting,passing,defending,dribbling,physical"
+
+def _write(tmp_path, text):
+    path = tmp_path / "roster.csv"
+    path.write_text(text)
+    return str(path)
+
+def test_valid_rows_are_coerced(tmp_path):
+    path = _write(tmp_path, HEADER + ",isSubscribed,availableDates\n"
+                  " Ann ,mid,70,30,left,Spain,50,51,52,53,54,55,yes,2026-11-01;2026-10-25\n")
+    (chunk,) = read_chunks(path, "csv")
+    players, rows, errors = validate_chunk(chunk, 2)
+    assert errors == [] and rows == [2]
+    player = players[0]
+    assert (player.name, player.position, player.preferredFoot, player.isSubscribed) == ("Ann", "MID", "Left", True)
+    assert player.skills.shooting == 51 and player.availableDates == ["2026-10-25", "2026-11-01"]
+    assert player == Player(**player.model_dump())
+
+def test_every_problem_of_a_row_is_reported(tmp_path):
+    path = _write(tmp_path, HEADER + ",availableDates\n"
+                  "Bob,GK,70,30,Left,Spain,50,50,50,50,50,50,\n"
+                  "\n"
+                  "Cy,ATT,100,12.5,Right,,50,50,50,50,50,0,2026-13-01\n"
+                  "Dee,DEF,99,16,Right,India,1,99,50,50,50,50,\n")
+    (chunk,) = read_chunks(path, "csv")
+    players, rows, errors = validate_chunk(chunk, 10)
+    assert rows == [13] and [p.name for p in players] == ["Dee"]
+    assert errors[0] == "Row 10: position must be DEF, MID or ATT"
+    assert errors[1].startswith("Row 12: nationality is required")
+    for column in ("points", "age", "physical", "availableDates"):
+        assert column in errors[1]
+
+def test_infinite_numbers_are_row_errors(tmp_path):
+    path = _write(tmp_path, HEADER + "\n"
+                  "Ann,MID,70,30,Left,Spain,inf,50,50,50,50,50\n"
+                  "Bob,MID,1e400,30,Left,Spain,50,50,50,50,50,50\n"
+                  "Cy,MID,70,30,Left,Spain,50,50,50,50,50,50\n")
+    (chunk,) = read_chunks(path, "csv")
+    players, rows, errors = validate_chunk(chunk, 2)
+    assert [p.name for p in players] == ["Cy"] and rows == [4]
+    assert errors == ["Row 2: pace must be a whole number from 1 to 99", "Row 3: points must be a whole number from 1 to 99"]
+
+def test_chunks_are_bounded(tmp_path):
+    rows = "".join(f"P{i},DEF,50,20,Left,UK,5,5,5,5,5,5\n" for i in range(25))
+    chunks = list(read_chunks(_write(tmp_path, HEADER + "\n" + rows), "csv", chunk_rows=10))
+    assert [len(c) for c in chunks] == [10, 10, 5]
+
+def test_missing_columns(tmp_path):
+    with pytest.raises(ValueError, match="Missing columns: points"):
+        list(read_chunks(_write(tmp_path, "name,position\nA,DEF\n"), "csv"))
+
+def test_xlsx(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(HEADER.split(",") + ["availableDates"])
+    sheet.append(["Xa", "DEF", 70, 20, "Left", "UK", 1, 2, 3, 4, 5, 6, datetime(2026, 10, 25)])
+    sheet.append([None] * 13)
+    sheet.append(["Xb", "DEF", 70.5, 20, "Left", "UK", 1, 2, 3, 4, 5, 6])
+    path = tmp_path / "roster.xlsx"
+    workbook.save(path)
+    (chunk,) = read_chunks(str(path), "xlsx")
+    players, rows, errors = validate_chunk(chunk, 2)
+    assert [p.availableDates for p in players] == [["2026-10-25"]]
+    assert errors == ["Row 4: points must be a whole number from 1 to 99"]
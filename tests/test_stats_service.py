@@ -0,0 +1,70 @@
+import asyncio
+
+from services.events import roster_events
+from services.cache import ROSTER, cache
+from services.stats_service import SKILLS, roster_stats, shape_stats, stats_pipeline
+
+def _facets(players=4, subscribed=1):
+    return {
+        "totals": [{"_id": None, "players": players, "subscribed": subscribed, "avgPoints": 70.123}],
+        "positions": [{"_id": "DEF", "count": players, "avgPoints": 70.123, "minPoints": 60, "maxPoints": 80}],
+        "skills": [{"_id": None, **{f"{s}_{op}": 50 for s in SKILLS for op in ("avg", "min", "max")}}],
+        **{f"buckets_{s}": [{"_id": 40, "count": players}] for s in SKILLS},
+    }
+
+def test_pipeline_is_a_single_facet_stage():
+    pipeline = stats_pipeline()
+    assert len(pipeline) == 1
+    assert set(pipeline[0]["$facet"]) == {"totals", "positions", "skills"} | {f"buckets_{s}" for s in SKILLS}
+
+def test_shape_fills_missing_positions_and_buckets():
+    stats = shape_stats(_facets())
+    assert stats["subscriptionRatio"] == 0.25
+    assert stats["avgPoints"] == 70.12
+    assert stats["positions"]["MID"] == {"count": 0, "avgPoints": None, "minPoints": None, "maxPoints": None}
+    assert [b["count"] for b in stats["skills"]["pace"]["histogram"]] == [0, 0, 4, 0, 0]
+
+def test_empty_roster():
+    empty = {"totals": [], "positions": [], "skills": [], **{f"buckets_{s}": [] for s in SKILLS}}
+    stats = shape_stats(empty)
+    assert stats["players"] == 0 and stats["subscriptionRatio"] == 0.0
+
+class _FakePlayers:
+    def __init__(self):
+        self.calls = 0
+        self.on_query = None
+
+    def aggregate(self, pipeline):
+        self.calls += 1
+        outer = self
+
+        class _Cursor:
+            async def to_list(self, length):
+                if outer.on_query:
+                    await outer.on_query()
+                await asyncio.sleep(0)
+                return [_facets(players=outer.calls)]
+        return _Cursor()
+
+class _FakeDb:
+    def __init__(self):
+        self.players = _FakePlayers()
+
+def test_cached_until_a_roster_event():
+    async def run():
+        db = _FakeDb()
+        await cache.invalidate(ROSTER)
+        assert (await roster_stats(db))["players"] == 1
+        assert (await roster_stats(db))["players"] == 1
+        await roster_events.publish("update", "p1", {"points": 50})
+        assert (await roster_stats(db))["players"] == 2
+    asyncio.run(run())
+
+def test_stats_computed_across_a_write_are_not_cached():
+    async def run():
+        db = _FakeDb()
+        await cache.invalidate(ROSTER)
+        db.players.on_query = lambda: roster_events.publish("delete", "p1")
+        await roster_stats(db)
+        assert await cache.get(ROSTER, "stats") is None
+    asyncio.run(run())
@@ -0,0 +1,17 @@
+from datetime import datetime
+
+import pytest
+
+from services.sync_service import encode_token, decode_token
+
+def test_token_round_trip_keeps_milliseconds():
+    moment = datetime(2026, 10, 19, 12, 30, 15, 123000)
+    assert decode_token(encode_token(moment)) == moment
+
+def test_tokens_order_like_time():
+    assert int(encode_token(datetime(2026, 1, 1))) < int(encode_token(datetime(2026, 1, 2)))
+
+@pytest.mark.parametrize("token", ["", "abc", "-5", "12.5"])
+def test_malformed_token(token):
+    with pytest.raises(ValueError):
+        decode_token(token)